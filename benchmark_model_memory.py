@@ -0,0 +1,189 @@
+import os
+import gc
+import argparse
+import tempfile
+import tracemalloc
+from typing import Callable
+import pandas as pd
+from lxml import etree
+from models.reportProcessing2.Report import ReportLoader
+from models.reportProcessing2.ReportFinder import ReportPath
+from models.reportProcessing2.SuiteReport import CaseRecord
+from models.reportProcessing2.ModuleCase import CaseResult
+
+
+def write_synthetic_xml(filepath: str, module_num: int, case_num: int, fail_step: int):
+    # 每 fail_step 个 case 中有一个 fail，其余 pass
+    module_list = []
+    passed_sum, failed_sum = 0, 0
+    for m in range(module_num):
+        test_list = []
+        passed = 0
+        for c in range(case_num):
+            if c % fail_step == 0:
+                test_list.append('<Test result="fail" name="test%d"><Failure message="java.lang.AssertionError: '
+                                 'expected true at line %d"/></Test>' % (c, c % 97))
+            else:
+                test_list.append('<Test result="pass" name="test%d"/>' % c)
+                passed += 1
+        passed_sum += passed
+        failed_sum += case_num - passed
+        module_list.append('<Module name="CtsBenchmarkModule%d" abi="arm64-v8a" runtime="1" done="true" pass="%d" '
+                           'total_tests="%d"><TestCase name="android.benchmark.Test%d">%s</TestCase></Module>'
+                           % (m, passed, case_num, m, ''.join(test_list)))
+    with open(filepath, 'w', encoding='UTF-8') as f:
+        f.write("<?xml version='1.0' encoding='UTF-8' standalone='no' ?>\n")
+        f.write('<Result start="0" end="0" suite_name="CTS"><Build build_abis="arm64-v8a"/>')
+        f.write('<Summary pass="%d" failed="%d" modules_done="%d" modules_total="%d"/>'
+                % (passed_sum, failed_sum, module_num, module_num))
+        for module in module_list:
+            f.write(module)
+        f.write('</Result>\n')
+
+
+# 改动前（CaseStore 与 __slots__ 之前）的模型布局：属性保存在实例 __dict__ 中，每个 Case 持有自己的字符串
+class LegacyCase:
+    def __init__(self, name: str, result: CaseResult, details: str | None):
+        self.__name = name
+        self.__result = result
+        self.__details = details
+
+
+class LegacyModule:
+    def __init__(self, name: str, done: str, case_list: list[LegacyCase]):
+        self.__name = name
+        self.__done = done
+        self.__case_list = case_list
+
+
+class LegacyRecord:
+    def __init__(self, report, case: LegacyCase):
+        self.report = report
+        self.case = case
+
+
+class LegacyCaseRecord:
+    def __init__(self, case_name: str, module_name: str):
+        self.__case_name = case_name
+        self.__module_name = module_name
+        self.__records: list[LegacyRecord] = []
+
+
+class LegacyReportPath:
+    def __init__(self):
+        self.__real = None
+        self.__logical = None
+        self.__suite_name = None
+        self.__miss_rp = None
+        self.__dir_name = None
+        self.__report = None
+
+
+def read_raw_modules(filepath: str):
+    # 在统计之外读取 xml 的原始内容：[((abi, name, done), [(testcase, test, result, message), ...]), ...]
+    module_list = []
+    test_list, testcase_name = [], None
+    for event, elem in etree.iterparse(filepath, events=('start', 'end'), huge_tree=True):
+        if event == 'start':
+            if elem.tag == 'TestCase':
+                testcase_name = elem.get('name')
+            continue
+        if elem.tag == 'Test':
+            failure = elem.find('Failure')
+            test_list.append((testcase_name, elem.get('name'), elem.get('result'),
+                              None if failure is None else failure.get('message')))
+        elif elem.tag == 'Module':
+            module_list.append(((elem.get('abi'), elem.get('name'), elem.get('done')), test_list))
+            test_list = []
+            elem.clear(keep_tail=False)
+    return module_list
+
+
+def copy_string(value: str | None):
+    # 改动前每个 Case 的 details 都是解析时新建的字符串，复制后计入统计
+    return None if value is None else (value + ' ')[:-1]
+
+
+def create_legacy_modules(raw_modules: list):
+    def create_case(test: tuple[str, str, str, str | None]):
+        return LegacyCase('#'.join([test[0], test[1]]), CaseResult.of_type(test[2]), copy_string(test[3]))
+
+    return list(map(lambda x: LegacyModule(' '.join([x[0][0], x[0][1]]), x[0][2], list(map(create_case, x[1]))),
+                    raw_modules))
+
+
+def traced(build: Callable[[], object]):
+    # 返回 build 的结果及其保留的内存（不含构建过程中已释放的部分）
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    result = build()
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return result, size
+
+
+def compare_row(model: str, num: int, old_size: int, new_size: int):
+    num = max(num, 1)
+    return [model, num, old_size / num, new_size / num, old_size / 1024 ** 2, new_size / 1024 ** 2,
+            old_size / max(new_size, 1)]
+
+
+def compare_models(xml_file: str):
+    raw_modules = read_raw_modules(xml_file)
+    case_num = sum(map(lambda x: len(x[1]), raw_modules))
+    result = []
+    # Report 的全部 case：改动前为 Module + 每个 case 一个 Case 对象，现在为 Module + 列式的 CaseStore
+    legacy_modules, old_size = traced(lambda: create_legacy_modules(raw_modules))
+    (_, store, _), new_size = traced(lambda: ReportLoader.load_xml_by_iterparse(xml_file))
+    result.append(compare_row('Report (Module + Case per case)', case_num, old_size, new_size))
+    # 失败 case 的记录：改动前 Record 引用已存在的 Case，现在 Record 仅保存行号，Case 使用时再创建
+    legacy_failed = [case for module in legacy_modules for case in module.__dict__['_LegacyModule__case_list']
+                     if case.__dict__['_LegacyCase__result'] is CaseResult.FAILED]
+    failed_rows = list(filter(lambda x: store.result_of(x) is CaseResult.FAILED, range(store.size)))
+    _, old_size = traced(lambda: list(map(lambda x: LegacyRecord(None, x), legacy_failed)))
+    _, new_size = traced(lambda: list(map(lambda x: CaseRecord.Record(None, x), failed_rows)))
+    result.append(compare_row('CaseRecord.Record', len(failed_rows), old_size, new_size))
+    # CaseRecord 与 ReportPath 的属性未变，仅比较 __dict__ 与 __slots__
+    failed_names = list(map(lambda x: store.name_of(x), failed_rows))
+    _, old_size = traced(lambda: list(map(lambda x: LegacyCaseRecord(x, ''), failed_names)))
+    _, new_size = traced(lambda: list(map(lambda x: CaseRecord(x, ''), failed_names)))
+    result.append(compare_row('CaseRecord', len(failed_names), old_size, new_size))
+
+    slot_names = list(map(lambda x: '_ReportPath' + x, ReportPath.__slots__))
+
+    def create_report_path(_):
+        # ReportPath 需要完整的 ReportHead，此处仅创建实例并将属性置为 None
+        report_path = object.__new__(ReportPath)
+        for name in slot_names:
+            object.__setattr__(report_path, name, None)
+        return report_path
+
+    path_num = len(failed_rows)
+    _, old_size = traced(lambda: list(map(lambda x: LegacyReportPath(), range(path_num))))
+    _, new_size = traced(lambda: list(map(create_report_path, range(path_num))))
+    result.append(compare_row('ReportPath', path_num, old_size, new_size))
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(usage='--modules <num> --cases <num>',
+                                     description='Memory benchmark of the model classes of reportProcessing2 '
+                                                 'against the layout before CaseStore and __slots__.')
+    parser.add_argument('--modules', type=int, default=500,
+                        help="Num of modules in the synthetic Report.")
+    parser.add_argument('--cases', type=int, default=2000,
+                        help="Num of cases in each module of the synthetic Report.")
+    parser.add_argument('--fail-step', type=int, default=20,
+                        help="One of every fail_step cases is failed.")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        xml_file = os.path.join(temp_dir, 'test_result.xml')
+        write_synthetic_xml(xml_file, args.modules, args.cases, args.fail_step)
+        result_table = pd.DataFrame(compare_models(xml_file),
+                                    columns=['Model', 'Instances', 'OldBytesPerInstance', 'NewBytesPerInstance',
+                                             'OldMB', 'NewMB', 'Ratio'])
+    pd.set_option('display.width', 200)
+    print("Old: dict-backed models before CaseStore and __slots__, each Case holds its name, result and details.")
+    print("New: current models; the Report row counts the whole CaseStore, the Record row counts the Records only.")
+    print(result_table.round(2).to_string(index=False))
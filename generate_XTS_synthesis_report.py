@@ -2,7 +2,7 @@ import os
 import argparse
 import time
 import shutil
-from models.reportProcessing2 import XTSReport
+from models.reportProcessing2 import XTSReport, ReportCache, VerifyPolicy, VerifyLevel
 
 
 def project_nickname(dir_path: str):
@@ -22,6 +22,26 @@ if __name__ == '__main__':
                         help="Select to output history or not.")
     parser.add_argument('--unpack', action='store_true',
                         help="Select to load Report from package(*.zip|*.rar) or not.")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Select to parse every Report again instead of loading it from cache.")
+    parser.add_argument('--clear-cache', action='store_true',
+                        help="Select to clear the cache of parsed Report(s) before loading.")
+    parser.add_argument('--cache-size', type=int, default=2048,
+                        help="Max size(MB) of the cache of parsed Report(s).")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Number of processes to parse Report(s) in parallel.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Select to only parse new Report(s) and fold them into the saved merge state or not.")
+    parser.add_argument('--selective', action='store_true',
+                        help="Select to skip reading the failure details of the modules which have passed in main "
+                             "Report when parsing other Report(s) or not.")
+    parser.add_argument('--quick', action='store_true',
+                        help="Select to only count the results and output the SUM sheet or not.")
+    parser.add_argument('--compress-details', action='store_true',
+                        help="Select to compress long failure details in memory or not.")
+    parser.add_argument('--ro-property', type=str, nargs='+', default=None,
+                        help="Names of the ro properties to keep from device info, default: the built-in list.")
+    VerifyPolicy.add_arguments(parser, default_level=VerifyLevel.FULL)
     args = parser.parse_args([
         # '--dir', r"E:\ProjectPyCharm\MOKA_IP\GoogleReportManager\GoogleReports\51M_JP2K SPL0805\0813",
         '--dir', r"E:\ProjectPyCharm\MOKA_IP\GoogleReportManager\GoogleReports\CTS+VTS",
@@ -30,7 +50,16 @@ if __name__ == '__main__':
     ])
     # args = parser.parse_args()
     xts_path: str = args.dir
-    xts_report = XTSReport(xts_path, flag_unpack=args.unpack)
+    report_cache = None
+    if not args.no_cache:
+        report_cache = ReportCache(max_size=args.cache_size * 1024 ** 2)
+        if args.clear_cache:
+            report_cache.clear()
+    verify_policy = VerifyPolicy.from_arguments(args)
+    xts_report = XTSReport(xts_path, flag_unpack=args.unpack, cache=report_cache, jobs=args.jobs,
+                           incremental=args.incremental, selective=args.selective, quick=args.quick,
+                           compress_details=args.compress_details, verify_policy=verify_policy,
+                           ro_property=args.ro_property)
     workbook = xts_report.get_workbook()
     pn_name = project_nickname(xts_path)
     workbook.save(os.path.join(xts_path, '.'.join([*pn_name, time.strftime('%Y.%m.%d_%H.%M.%S'), 'xlsx'])))
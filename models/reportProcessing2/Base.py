@@ -1,5 +1,6 @@
 import logging
 import os
+import threading
 
 LOG_FORMAT = ">>> %(asctime)s [%(levelname)s] %(module)s:%(name)s.%(funcName)s >>>\n%(message)s"
 logging.basicConfig(format=LOG_FORMAT, level=logging.INFO)
@@ -8,6 +9,8 @@ LOG_DIR = r".\runtime logs"
 
 class Base:
     logger: logging.Logger = logging.getLogger()
+    # 多个线程同时创建实例时，避免同一 logger 重复添加 FileHandler
+    __config_lock = threading.Lock()
 
     def __init__(self):
         self.config()
@@ -18,10 +21,13 @@ class Base:
             cls.logger = logger
         else:
             name = cls.__name__
-            if cls.logger.name != name:
-                logger = cls.__init_logger(name)
-                logger.debug("[%s] start logging.", name)
-                cls.logger = logger
+            if cls.logger.name == name:
+                return
+            with cls.__config_lock:
+                if cls.logger.name != name:
+                    logger = cls.__init_logger(name)
+                    logger.debug("[%s] start logging.", name)
+                    cls.logger = logger
 
     @staticmethod
     def __init_logger(name: str):
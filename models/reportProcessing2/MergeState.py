@@ -0,0 +1,89 @@
+import os
+import pickle
+from .Base import Base
+from .ReportCache import ReportCache
+from .VerifyPolicy import VerifyPolicy, VerifyLevel
+from . import utils
+
+
+class MergeState(Base):
+    __version = 11
+    __suffix = '.merge_state'
+
+    def __init__(self, suite_dir: str):
+        super().__init__()
+        front_path, suite_name = os.path.split(utils.absolute_path(suite_dir))
+        # 保存在套件文件夹旁（而非文件夹内），避免改动套件文件夹本身
+        self.__state_path = os.path.join(front_path, '.' + suite_name + self.__suffix)
+        # 已确认未被修改的 Report 的 (文件属性, 内容哈希)，保存时文件属性不变则沿用其哈希
+        self.__known_reports: dict[str, tuple[tuple, str]] = dict()
+
+    @property
+    def state_path(self):
+        return self.__state_path
+
+    def load(self, report_dict: dict[str, list[str]], selective=False, ro_property: list[str] = None,
+             verify_level: VerifyLevel = VerifyLevel.FULL):
+        # report_dict: 套件当前所有 Report 的路径及其关键文件；selective: 非 main 的 Report 是否按 main_report 跳过 failure details
+        # ro_property: Report 的 device info 中保留的属性；verify_level: 本次要求的 Report 核对级别
+        if not os.path.exists(self.__state_path):
+            return None
+        known_reports = dict()
+        try:
+            with open(self.__state_path, 'rb') as f:
+                header: dict = pickle.load(f)
+                if header.get('version') != self.__version:
+                    raise ValueError("Outdated merge state version: %s." % header.get('version'))
+                if header.get('selective') != selective:
+                    raise ValueError("Merge state was built with selective=%s, but given: %s."
+                                     % (header.get('selective'), selective))
+                if header.get('ro_property') != ro_property:
+                    raise ValueError("Merge state was built with other ro_property: %s." % header.get('ro_property'))
+                if not VerifyPolicy.is_covered(verify_level, header.get('verify_level')):
+                    raise ValueError("Merge state was verified at %s level, but %s level is required."
+                                     % (header['verify_level'].value, verify_level.value))
+                for report_path, (identity, digest) in header['reports'].items():
+                    if report_path not in report_dict.keys():
+                        raise ValueError("Report has been removed: %s." % report_path)
+                    file_list = report_dict[report_path]
+                    # 文件属性变化（例如重新解压）时，按内容哈希确认 Report 是否被修改
+                    current_identity = ReportCache.file_identity(file_list)
+                    if identity != current_identity and digest != ReportCache.content_hash(file_list):
+                        raise ValueError("Content of Report has been changed: %s." % report_path)
+                    known_reports[report_path] = (current_identity, digest)
+                state = pickle.load(f)
+        except (ValueError, KeyError, EOFError, pickle.UnpicklingError) as e:
+            self.logger.info("Invalidate merge state: %s\n\t%s", self.__state_path, e)
+            self.invalidate()
+            return None
+        self.__known_reports = known_reports
+        return state
+
+    def save(self, report_dict: dict[str, list[str]], state: dict, selective=False, ro_property: list[str] = None,
+             verify_level: VerifyLevel = VerifyLevel.FULL):
+        # 合入时已保存的 Report 的核对级别满足 verify_level，新增的 Report 按 verify_level 核对
+        header = {
+            'version': self.__version,
+            'selective': selective,
+            'ro_property': ro_property,
+            'verify_level': verify_level,
+            'reports': dict(map(lambda x: (x[0], self.__identity_digest(*x)), report_dict.items())),
+        }
+        temp = '%s.%d.tmp' % (self.__state_path, os.getpid())
+        with open(temp, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, self.__state_path)
+
+    def __identity_digest(self, report_path: str, file_list: list[str]):
+        # 只读取新增或被修改的 Report 的文件计算哈希
+        identity = ReportCache.file_identity(file_list)
+        known_identity, digest = self.__known_reports.get(report_path, (None, None))
+        if known_identity != identity:
+            digest = ReportCache.content_hash(file_list)
+        self.__known_reports[report_path] = (identity, digest)
+        return identity, digest
+
+    def invalidate(self):
+        if os.path.exists(self.__state_path):
+            os.remove(self.__state_path)
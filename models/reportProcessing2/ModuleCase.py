@@ -1,6 +1,10 @@
-import bs4
 from enum import Enum
+from array import array
+import zlib
+import numpy as np
 import pandas as pd
+from lxml import etree
+from .utils import vfs
 
 
 class CaseResult(Enum):
@@ -13,72 +17,307 @@ class CaseResult(Enum):
         self.result_id = result_id
         self.result_type = result_type
 
+    @classmethod
+    def of_id(cls, result_id: int):
+        return _RESULT_ID_MAP[result_id]
+
+    @classmethod
+    def of_type(cls, result_type: str):
+        return _RESULT_TYPE_MAP.get(result_type)
+
+
+_RESULT_ID_MAP = dict(map(lambda x: (x.result_id, x), CaseResult))
+_RESULT_TYPE_MAP = dict(map(lambda x: (x.result_type, x), CaseResult))
+# 同一 case 有多个结果时的合并优先级：pass > ASSUMPTION_FAILURE > IGNORED > fail
+_MERGE_PRIORITY = [CaseResult.PASSED, CaseResult.ASSUMPTION_FAILURE, CaseResult.IGNORED, CaseResult.FAILED]
+# 以 result_id + 1 为下标查找优先级，下标 0 对应缺失的结果（-1），按 fail 处理
+_PRIORITY_OF_ID = np.array([_MERGE_PRIORITY.index(CaseResult.FAILED)]
+                           + list(map(lambda x: _MERGE_PRIORITY.index(CaseResult.of_id(x)), range(len(CaseResult)))),
+                           dtype=np.int8)
+_ID_OF_PRIORITY = np.array(list(map(lambda x: x.result_id, _MERGE_PRIORITY)), dtype=np.int8)
+
+
+# 套件内所有 Report 共用的驻留表：module 名称与 case 名称共用同一套 id，相同的 failure message 只保存一份
+class InternTable:
+    def __init__(self, compress=False, compress_size: int = 1024):
+        if compress_size <= 0:
+            raise ValueError("The compress_size of InternTable should be positive, but given: %s" % compress_size)
+        self.__ids: dict[str, int] = dict()
+        self.__values: list[str] = []
+        # 未压缩的 message 以自身为 key，压缩的以压缩结果为 key（zlib 对相同输入的输出相同），均不额外保留原文
+        self.__messages: dict[str | bytes, str | bytes] = dict()
+        self.__compress = compress
+        self.__compress_size = compress_size
 
-class Case:
-    def __init__(self, test_tag: bs4.Tag, no_details=False):
-        test_name = test_tag['name']
-        testcase_name = test_tag.find_parent('TestCase')['name']
-        self.__name = '#'.join([testcase_name, test_name])
-        test_result = test_tag['result']
-        self.__result = None
-        for cr in CaseResult:
-            if test_result == cr.result_type:
-                self.__result = cr
-        self.__details = None
-        if self.__result is CaseResult.FAILED:
-            failure = test_tag.find('Failure')
-            if failure is not None:
-                self.__details = failure['message']
-            elif no_details:
-                self.__details = ''
-        self.__verify(test_tag)
+    @property
+    def ids(self):
+        return self.__ids
 
-    def __verify(self, test_tag: bs4.Tag):
-        if self.__result is None:
+    @property
+    def values(self):
+        return self.__values
+
+    @property
+    def size(self):
+        return len(self.__values)
+
+    def intern(self, value: str):
+        value_id = self.__ids.get(value)
+        if value_id is None:
+            value_id = len(self.__values)
+            self.__ids[value] = value_id
+            self.__values.append(value)
+        return value_id
+
+    def intern_array(self, value_list: list[str]):
+        return np.fromiter(map(self.intern, value_list), dtype=np.int32, count=len(value_list))
+
+    def value_of(self, value_id: int):
+        return self.__values[value_id]
+
+    def values_of(self, id_array: np.ndarray):
+        return np.asarray(self.__values, dtype=object)[id_array]
+
+    def intern_message(self, message: str):
+        if self.__compress and len(message) >= self.__compress_size:
+            message = zlib.compress(message.encode('UTF-8'))
+        return self.__messages.setdefault(message, message)
+
+    @staticmethod
+    def restore_message(message: str | bytes):
+        if type(message) is bytes:
+            return zlib.decompress(message).decode('UTF-8')
+        return message
+
+
+# 以列式结构保存一个 Report 中的所有 case：case 名称驻留为 id，结果以 int8 编码，failure details 仅为 failed 的行单独保存
+class CaseStore:
+    def __init__(self, source: str = None):
+        self.__name_ids: dict[str, int] = dict()
+        self.__names: list[str] = []
+        # 加载期间使用 array 追加，加载完成后 freeze 为 numpy 数组
+        self.__name_id_col: array | np.ndarray = array('i')
+        self.__result_col: array | np.ndarray = array('b')
+        # failure details 为 int 时表示其 <Failure> 在 source（test_result.xml）中的行号，使用时再读取，
+        # 为 bytes 时表示经 InternTable 压缩的 message
+        self.__source = source
+        self.__details: dict[int, str | int | bytes] = dict()
+        self.__intern_table: InternTable | None = None
+
+    def __intern_name(self, case_name: str):
+        name_id = self.__name_ids.get(case_name)
+        if name_id is None:
+            name_id = len(self.__names)
+            self.__name_ids[case_name] = name_id
+            self.__names.append(case_name)
+        return name_id
+
+    def append(self, case_name: str, test_result: str, failure_message: str | int = None, no_details=False):
+        case_result = CaseResult.of_type(test_result)
+        if case_result is None:
             raise ValueError('Unexpected case result: %s, expected: %s.'
-                             % (test_tag['result'], list(map(lambda x: x.result_type, CaseResult))))
-        if self.__result is CaseResult.FAILED and self.__details is None:
-            raise ValueError("Test result is %s, but failure details not found.", CaseResult.FAILED.result_type)
+                             % (test_result, list(map(lambda x: x.result_type, CaseResult))))
+        row = len(self.__result_col)
+        if case_result is CaseResult.FAILED:
+            if failure_message is not None:
+                if type(failure_message) is int and self.__source is None:
+                    raise ValueError("Failure details by line number requires the source of CaseStore.")
+                self.__details[row] = failure_message
+            elif no_details:
+                self.__details[row] = ''
+            else:
+                raise ValueError("Test result is %s, but failure details not found.", CaseResult.FAILED.result_type)
+        self.__name_id_col.append(self.__intern_name(case_name))
+        self.__result_col.append(case_result.result_id)
+        return row
+
+    def extend(self, test_list: list[tuple[str, str, str | int | None]], no_details=False):
+        start = self.size
+        for test in test_list:
+            self.append(*test, no_details=no_details)
+        return start, self.size
+
+    def freeze(self):
+        if type(self.__result_col) is array:
+            self.__name_id_col = np.array(self.__name_id_col, dtype=np.int32)
+            self.__result_col = np.array(self.__result_col, dtype=np.int8)
+
+    def intern_by(self, table: InternTable):
+        # 改用 table 的 id，名称列表与 table 共享；仅用于 freeze 之后
+        if self.__intern_table is table:
+            return
+        if self.__intern_table is not None:
+            raise ValueError("CaseStore has been interned by another InternTable.")
+        self.freeze()
+        id_map = table.intern_array(self.__names)
+        self.__name_id_col = id_map[self.__name_id_col]
+        self.__name_ids, self.__names = table.ids, table.values
+        self.__details = dict(map(lambda x: (x[0], x[1] if type(x[1]) is int else table.intern_message(x[1])),
+                                  self.__details.items()))
+        self.__intern_table = table
+
+    @property
+    def intern_table(self):
+        return self.__intern_table
+
+    @property
+    def size(self):
+        return len(self.__result_col)
+
+    def name_id_of(self, case_name: str):
+        return self.__name_ids.get(case_name)
+
+    def name_of(self, row: int):
+        return self.__names[self.__name_id_col[row]]
+
+    def result_of(self, row: int):
+        return CaseResult.of_id(int(self.__result_col[row]))
+
+    def details_of(self, row: int):
+        return self.details_of_rows([row]).get(row)
+
+    def details_of_rows(self, rows: list[int]):
+        details = dict(map(lambda x: (x, InternTable.restore_message(self.__details.get(x))), rows))
+        line_rows: dict[int, list[int]] = dict()
+        for row, value in details.items():
+            if type(value) is int:
+                line_rows.setdefault(value, []).append(row)
+        if len(line_rows) != 0:
+            for line, message in self.__read_failure_message(self.__source, set(line_rows.keys())).items():
+                for row in line_rows[line]:
+                    details[row] = message
+        return details
+
+    @staticmethod
+    def __read_failure_message(source: str, line_set: set[int]):
+        # 顺序读取一次文件，从 <Failure 处开始增量解析其开始标签，开始标签结束的行即为其行号（sourceline）
+        message_dict: dict[int, str] = dict()
+        last_line = max(line_set)
+        parser = None
+        with vfs.open_binary(source) as f:
+            for i, line in enumerate(f, start=1):
+                if i > last_line:
+                    break
+                if parser is None:
+                    index = line.find(b'<Failure')
+                    if index < 0:
+                        continue
+                    parser = etree.XMLPullParser(events=('start',), huge_tree=True)
+                    line = line[index:]
+                try:
+                    parser.feed(line)
+                except etree.XMLSyntaxError:
+                    # 开始标签之后的内容不完整，已解析出的事件仍然有效
+                    pass
+                for _, elem in parser.read_events():
+                    if i in line_set:
+                        message_dict[i] = elem.get('message')
+                    break
+                else:
+                    continue
+                parser = None
+        missing_line = line_set - message_dict.keys()
+        if len(missing_line) != 0:
+            # 无法按行定位时（例如一行中有多个 <Failure>），完整解析文件查找
+            with vfs.open_binary(source) as f:
+                for _, elem in etree.iterparse(f, events=('end',), tag='Failure', huge_tree=True):
+                    if elem.sourceline in missing_line:
+                        message_dict[elem.sourceline] = elem.get('message')
+                        missing_line.remove(elem.sourceline)
+                        if len(missing_line) == 0:
+                            break
+                    elem.clear(keep_tail=False)
+        if len(missing_line) != 0:
+            raise ValueError("Failure details not found in lines %s of %s." % (sorted(missing_line), source))
+        return message_dict
+
+    def name_ids(self, start: int, stop: int):
+        return np.asarray(self.__name_id_col[start:stop], dtype=np.int32)
+
+    def names(self, start: int, stop: int):
+        return list(map(lambda x: self.__names[x], self.__name_id_col[start:stop]))
+
+    def results(self, start: int, stop: int):
+        return np.asarray(self.__result_col[start:stop], dtype=np.int8)
+
+
+class Case:
+    # Case 按需大量创建，使用 __slots__ 省去实例 __dict__；创建后不可修改
+    __slots__ = ('__store', '__row')
+
+    def __init__(self, store: CaseStore, row: int):
+        object.__setattr__(self, '_Case__store', store)
+        object.__setattr__(self, '_Case__row', row)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Case is immutable, can not set attribute: %s" % key)
+
+    def __delattr__(self, key):
+        raise AttributeError("Case is immutable, can not delete attribute: %s" % key)
+
+    def __reduce__(self):
+        return self.__class__, (self.__store, self.__row)
+
+    @property
+    def row(self):
+        return self.__row
 
     @property
     def case_name(self):
-        return self.__name
+        return self.__store.name_of(self.__row)
 
     @property
     def result_enum(self):
-        return self.__result
+        return self.__store.result_of(self.__row)
 
-    def get_case_detail_table(self):
-        case_detail = pd.DataFrame([[self.__name, self.__result.result_type, self.__details]],
+    def get_case_detail_table(self, details_dict: dict[int, str] = None):
+        # details_dict 为批量读取的 failure details（CaseStore.details_of_rows），未提供时单独读取
+        if details_dict is None:
+            details = self.__store.details_of(self.__row)
+        else:
+            details = details_dict.get(self.__row)
+        case_detail = pd.DataFrame([[self.case_name, self.result_enum.result_type, details]],
                                    columns=['TestFailed', 'Result', 'Details'])
         return case_detail.fillna('/')
 
 
 class Module:
+    __slots__ = ('__name', '__done', '__store', '__start', '__stop', '__result_count', '__case_index')
     __exemption = {
         'cts_verifier': ' '.join(["noabi", "CtsVerifier"]),
     }
 
-    def __init__(self, module_tag: bs4.Tag):
-        module_name = module_tag['name']
-        module_abi = module_tag['abi']
+    def __init__(self, module_attrs: dict[str, str], store: CaseStore,
+                 test_list: list[tuple[str, str, str | int | None]], verify=True):
+        module_name = module_attrs['name']
+        module_abi = module_attrs['abi']
         self.__name = ' '.join([module_abi, module_name])
-        self.__done = module_tag['done']
-        test_tag_list = module_tag.find_all('Test')
+        self.__done = module_attrs['done']
         if self.__name == self.__exemption['cts_verifier']:
             no_details = True
         else:
             no_details = False
-        self.__case_list = list(map(lambda x: Case(x, no_details=no_details), test_tag_list))
-        self.__verify(module_tag)
-
-    def __verify(self, module_tag: bs4.Tag):
+        self.__store = store
+        self.__start, self.__stop = store.extend(test_list, no_details=no_details)
+        self.__result_count = np.bincount(store.results(self.__start, self.__stop), minlength=len(CaseResult))
+        # case 名称 id 到行号的索引，首次查找时建立
+        self.__case_index: dict[int, int] | None = None
+        if verify:
+            self.__verify(module_attrs)
+
+    def __verify(self, module_attrs: dict[str, str]):
         if self.__name != self.__exemption['cts_verifier']:
-            assert int(module_tag['total_tests']) == len(self.__case_list)
-        assert len(set(map(lambda x: x.case_name, self.__case_list))) == len(self.__case_list)
-        assert int(module_tag['pass']) == self.case_passed_num
+            assert int(module_attrs['total_tests']) == self.case_total_num
+        assert np.unique(self.__store.name_ids(self.__start, self.__stop)).shape[0] == self.case_total_num
+        assert int(module_attrs['pass']) == self.case_passed_num
         assert self.case_total_num == sum(list(map(lambda x: self.__count_case_result(x), CaseResult)))
 
+    def intern_by(self, table: InternTable):
+        # 行号索引以 case 名称 id 为 key，需与 CaseStore 一同改用 table 的 id
+        self.__store.intern_by(table)
+        self.__name = table.value_of(table.intern(self.__name))
+        self.__case_index = None
+
     @property
     def module_name(self):
         return self.__name
@@ -89,10 +328,10 @@ class Module:
 
     @property
     def case_total_num(self):
-        return len(self.__case_list)
+        return self.__stop - self.__start
 
     def __count_case_result(self, case_result: CaseResult):
-        return list(map(lambda x: x.result_enum, self.__case_list)).count(case_result)
+        return int(self.__result_count[case_result.result_id])
 
     @property
     def case_passed_num(self):
@@ -111,24 +350,19 @@ class Module:
         return self.__count_case_result(CaseResult.IGNORED)
 
     def find_case_by_name(self, case_name: str):
-        case_name_list = list(map(lambda x: x.case_name, self.__case_list))
-        if case_name in case_name_list:
-            return self.__case_list[case_name_list.index(case_name)]
-        else:
+        name_id = self.__store.name_id_of(case_name)
+        if name_id is None:
             return None
-
-    def generate_case_result_map(self):
-        if self.case_total_num == 0:
+        if self.__case_index is None:
+            name_ids = self.__store.name_ids(self.__start, self.__stop).tolist()
+            self.__case_index = dict(zip(name_ids, range(self.__start, self.__stop)))
+        row = self.__case_index.get(name_id)
+        if row is None:
             return None
-
-        def name_result(case: Case):
-            return case.case_name, case.result_enum.result_id
-
-        case_result_map = pd.DataFrame(list(map(lambda x: name_result(x), self.__case_list)))
-        return case_result_map
+        return Case(self.__store, row)
 
     def get_cases_note(self):
-        return '\n'.join(map(lambda x: x.case_name, self.__case_list))
+        return '\n'.join(self.__store.names(self.__start, self.__stop))
 
 
 class CaseNum:
@@ -139,20 +373,24 @@ class CaseNum:
                 raise KeyError("Key already existed, this may be because different CaseResult have same result_type.")
             self.__dict__[cr.result_type] = 0
 
-    def update_by_case_result_map(self, case_result_map: pd.DataFrame):
-        self.total += case_result_map.shape[0]
-        result_map = case_result_map.iloc[:, 1:].copy()
-        for cr in [CaseResult.PASSED, CaseResult.ASSUMPTION_FAILURE, CaseResult.IGNORED]:
-            row_index = result_map.eq(cr.result_id).any(axis=1)
-            cr_row = result_map[row_index]
-            self.add_of(cr, cr_row.shape[0])
-            result_map.drop(cr_row.index, inplace=True)
-        failed_id = CaseResult.FAILED.result_id
-        if not result_map.fillna(failed_id).eq(failed_id).all(axis=1).all():
-            raise ValueError("There are still non-failed results that have not been judged.")
-        self.add_of(CaseResult.FAILED, result_map.shape[0])
+    @classmethod
+    def reduce_result_matrix(cls, result_matrix: np.ndarray):
+        if result_matrix.size != 0 and (result_matrix.min() < -1 or result_matrix.max() >= len(CaseResult)):
+            raise ValueError("Unexpected result id in result_matrix, expected: -1 (missing) or %s."
+                             % list(map(lambda x: x.result_id, CaseResult)))
+        if result_matrix.shape[1] == 0:
+            return np.full(result_matrix.shape[0], CaseResult.FAILED.result_id, dtype=np.int8)
+        row_priority = _PRIORITY_OF_ID[result_matrix.astype(np.intp) + 1].min(axis=1)
+        return _ID_OF_PRIORITY[row_priority]
+
+    def update_by_result_matrix(self, result_matrix: np.ndarray):
+        merge_result = self.reduce_result_matrix(result_matrix)
+        result_count = np.bincount(merge_result, minlength=len(CaseResult))
+        self.total += result_matrix.shape[0]
+        for cr in CaseResult:
+            self.add_of(cr, int(result_count[cr.result_id]))
         self.verify()
-        return result_map
+        return merge_result
 
     def add_of(self, case_result: CaseResult, num: int):
         self.__dict__[case_result.result_type] += num
@@ -1,26 +1,37 @@
 import os
+import numpy as np
 import pandas as pd
 import bs4
 from bs4 import BeautifulSoup
 import json
 import fuzzywuzzy.process as fuzzysearch
 import dateutil.parser as dateparser
+import dateutil.tz
+import datetime
+import calendar
+import functools
 import re
+from array import array
+from lxml import etree
 from .Base import Base
-from .ModuleCase import Module, CaseResult, Case
+from .ReportCache import ReportCache
+from .VerifyPolicy import VerifyPolicy, VerifyLevel
+from .ModuleCase import Module, CaseResult, Case, CaseStore, InternTable
 from . import utils
 
 
 class ReportLoader:
+    __head_tags = ('Result', 'Summary', 'Build')
+
     @staticmethod
     def open_r_utf8(filepath: str):
-        return open(filepath, 'r', encoding='UTF-8')
+        return utils.vfs.open_text(filepath, encoding='UTF-8')
 
     @staticmethod
-    def load_summary_from_xml(bs: bs4.BeautifulSoup):
-        res = bs.find('Result')
-        summ = bs.find('Summary')
-        build = bs.find('Build')
+    def load_summary_from_xml(head: dict[str, dict[str, str]]):
+        res = head['Result']
+        summ = head['Summary']
+        build = head['Build']
         summary = {
             'Suite / Plan': ' / '.join([res['suite_name'], res['suite_plan']]),
             'Suite / Build': ' / '.join([res['suite_version'], res['suite_build_number']]),
@@ -38,32 +49,248 @@ class ReportLoader:
         summary: dict[str, str]
         return summary
 
+    @classmethod
+    def load_xml(cls, filepath: str, stream=True, skip_modules: set[str] = None, verify=True):
+        if stream:
+            return cls.load_xml_by_iterparse(filepath, skip_modules=skip_modules, verify=verify)
+        if skip_modules:
+            raise ValueError("The skip_modules is only supported when stream is True.")
+        with cls.open_r_utf8(filepath) as xml_f:
+            xml_bs = BeautifulSoup(xml_f, 'xml')
+        head = dict(map(lambda x: (x, xml_bs.find(x).attrs), cls.__head_tags))
+        store = CaseStore()
+        module_list = cls.load_result_from_xml(xml_bs, store, verify=verify)
+        store.freeze()
+        return head, store, module_list
+
     @staticmethod
-    def load_result_from_xml(bs: bs4.BeautifulSoup):
+    def load_result_from_xml(bs: bs4.BeautifulSoup, store: CaseStore, verify=True):
+        def name_result_failure(test_tag: bs4.Tag):
+            testcase_name = test_tag.find_parent('TestCase')['name']
+            failure = test_tag.find('Failure')
+            failure_message = None if failure is None else failure['message']
+            return '#'.join([testcase_name, test_tag['name']]), test_tag['result'], failure_message
+
         module_tag_list = bs.find_all('Module')
-        module_list = list(map(lambda x: Module(x), module_tag_list))
+        module_list = list(map(lambda x: Module(x.attrs, store, list(map(name_result_failure, x.find_all('Test'))),
+                                                verify=verify), module_tag_list))
         return module_list
 
+    @staticmethod
+    def __release_element(elem: etree._Element):
+        # 释放已解析的元素及其之前的兄弟元素，使内存占用不随文件大小增长
+        elem.clear(keep_tail=False)
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+    @classmethod
+    def load_xml_by_iterparse(cls, filepath: str, skip_modules: set[str] = None, verify=True):
+        # skip_modules 中的 module 同样保存全部 case 及其结果，仅不读取 failure details，只记录 <Failure> 的行号
+        if skip_modules is None:
+            skip_modules = set()
+        head: dict[str, dict[str, str]] = dict()
+        store = CaseStore(source=filepath)
+        module_list: list[Module] = []
+        module_attrs, testcase_name, test_list, skip_details = None, None, [], False
+        failure_line = None
+        with utils.vfs.open_binary(filepath) as xml_f:
+            for event, elem in etree.iterparse(xml_f, events=('start', 'end'), huge_tree=True):
+                tag = elem.tag
+                if event == 'start':
+                    if tag == 'TestCase':
+                        testcase_name = elem.get('name')
+                    elif tag == 'Module':
+                        module_attrs, test_list = dict(elem.attrib), []
+                        skip_details = ' '.join([module_attrs['abi'], module_attrs['name']]) in skip_modules
+                    elif tag in cls.__head_tags and tag not in head.keys():
+                        head[tag] = dict(elem.attrib)
+                    continue
+                if tag == 'Test':
+                    failure = elem.find('Failure')
+                    if failure is None:
+                        failure_message = None
+                    elif failure.sourceline != failure_line and (skip_details or failure.sourceline != elem.sourceline):
+                        # <Failure> 独占一行（格式化的 xml）时只记录行号，使用时再读取 message；
+                        # 同一行中只有第一个 <Failure> 可按行号读取
+                        failure_message = failure_line = failure.sourceline
+                    else:
+                        failure_message = failure.get('message')
+                        failure_line = failure.sourceline
+                    test_list.append(('#'.join([testcase_name, elem.get('name')]), elem.get('result'), failure_message))
+                elif tag == 'Module':
+                    module_list.append(Module(module_attrs, store, test_list, verify=verify))
+                    module_attrs, test_list, skip_details = None, [], False
+                elif tag != 'TestCase':
+                    continue
+                cls.__release_element(elem)
+        for tag in cls.__head_tags:
+            if tag not in head.keys():
+                raise ValueError("Tag <%s> not found in %s." % (tag, filepath))
+        store.freeze()
+        return head, store, module_list
+
+    @classmethod
+    def load_xml_counts(cls, filepath: str):
+        # 仅记录每个 case 所属的 module、名称与结果，不读取 failure details
+        head: dict[str, dict[str, str]] = dict()
+        module_names, module_done = [], []
+        case_module, case_names, case_results = array('i'), [], array('b')
+        testcase_name = None
+        with utils.vfs.open_binary(filepath) as xml_f:
+            for event, elem in etree.iterparse(xml_f, events=('start', 'end'), huge_tree=True):
+                tag = elem.tag
+                if event == 'end':
+                    if tag == 'Module':
+                        cls.__release_element(elem)
+                    continue
+                if tag == 'Test':
+                    case_result = CaseResult.of_type(elem.get('result'))
+                    if case_result is None:
+                        raise ValueError('Unexpected case result: %s, expected: %s.'
+                                         % (elem.get('result'), list(map(lambda x: x.result_type, CaseResult))))
+                    case_module.append(len(module_names) - 1)
+                    case_names.append('#'.join([testcase_name, elem.get('name')]))
+                    case_results.append(case_result.result_id)
+                elif tag == 'TestCase':
+                    testcase_name = elem.get('name')
+                elif tag == 'Module':
+                    module_names.append(' '.join([elem.get('abi'), elem.get('name')]))
+                    module_done.append(elem.get('done') == 'true')
+                elif tag in cls.__head_tags and tag not in head.keys():
+                    head[tag] = dict(elem.attrib)
+        for tag in cls.__head_tags:
+            if tag not in head.keys():
+                raise ValueError("Tag <%s> not found in %s." % (tag, filepath))
+        return head, module_names, np.array(module_done, dtype=bool), np.array(case_module, dtype=np.int32), \
+            case_names, np.array(case_results, dtype=np.int8)
+
+    @classmethod
+    def load_xml_head(cls, filepath: str):
+        head: dict[str, dict[str, str]] = dict()
+        with utils.vfs.open_binary(filepath) as xml_f:
+            # 只读取头部的开始标签，遇到第一个 <Module> 即停止解析
+            for _, elem in etree.iterparse(xml_f, events=('start',), huge_tree=True):
+                tag = elem.tag
+                if tag in cls.__head_tags and tag not in head.keys():
+                    head[tag] = dict(elem.attrib)
+                if len(head) == len(cls.__head_tags) or tag == 'Module':
+                    break
+        for tag in cls.__head_tags:
+            if tag not in head.keys():
+                raise ValueError("Tag <%s> not found in head of %s." % (tag, filepath))
+        return head
+
+    # JSON 中的字符串或括号；单独的引号表示字符串在缓冲区末尾被截断
+    __json_token_pattern = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\]"]')
+    __array_value_pattern = re.compile(r'\s*:\s*\[')
+    __incomplete_value_pattern = re.compile(r'\s*(:\s*)?')
+
     @classmethod
-    def load_device_info(cls, filepath: str):
-        if not os.path.exists(filepath):
+    def load_device_info(cls, filepath: str, ro_property: list[str] = None, chunk_size: int = 64 * 1024):
+        # 流式读取 ro_property 数组，只保留 ro_property（默认为 Report 的目标属性）中的属性
+        if not utils.vfs.isfile(filepath):
             return None
-        with cls.open_r_utf8(filepath) as js_f:
-            js_str = ''.join(js_f.readlines())
-        # 反转义反斜杠
-        js_str = js_str.replace(r'\/', '\\\\/')
-        js: dict = json.loads(js_str)
-        total_prop = pd.DataFrame(js['ro_property'])
-        target_prop = Report.filter_property(total_prop, on='name')
+        if ro_property is None:
+            ro_property = Report.default_ro_property()
+        target_set = set(ro_property)
+        prop_list = list(filter(lambda x: x.get('name') in target_set,
+                                cls.__iter_ro_property(filepath, chunk_size)))
+        total_prop = pd.DataFrame(prop_list) if len(prop_list) != 0 else pd.DataFrame(columns=['name', 'value'])
+        target_prop = Report.filter_property(total_prop, on='name', ro_property=ro_property)
         return target_prop
 
-    @staticmethod
-    def __reverse_timezone(time_str: str):
-        match_tz = re.search(r'[A-Z]*[+-][0-9]+', time_str)
+    @classmethod
+    def __iter_json_chunk(cls, filepath: str, chunk_size: int):
+        rest = ''
+        with cls.open_r_utf8(filepath) as js_f:
+            while chunk := js_f.read(chunk_size):
+                chunk, rest = rest + chunk, ''
+                # 末尾的反斜杠可能与下一块开头的斜杠组成 \/，留到下一块处理
+                if chunk.endswith('\\'):
+                    chunk, rest = chunk[:-1], '\\'
+                # 反转义反斜杠
+                yield chunk.replace(r'\/', '\\\\/')
+        if rest != '':
+            yield rest
+
+    @classmethod
+    def __seek_ro_property(cls, chunks, filepath: str):
+        # 查找顶层对象中的 "ro_property": [，跳过字符串值及嵌套对象中的同名内容，返回数组开始之后的缓冲区
+        buffer, pos, depth = '', 0, 0
+        for chunk in chunks:
+            buffer, pos = buffer[pos:] + chunk, 0
+            while (match_t := cls.__json_token_pattern.search(buffer, pos)) is not None:
+                token = match_t.group()
+                if token == '"':
+                    # 字符串被分在两块中，从其开头继续
+                    pos = match_t.start()
+                    break
+                pos = match_t.end()
+                if token in ('{', '['):
+                    depth += 1
+                elif token in ('}', ']'):
+                    depth -= 1
+                elif depth == 1 and token == '"ro_property"':
+                    match_v = cls.__array_value_pattern.match(buffer, pos)
+                    if match_v is not None:
+                        return buffer[match_v.end():]
+                    if cls.__incomplete_value_pattern.fullmatch(buffer, pos) is not None:
+                        # 其后的内容不完整，无法判断是否为 key
+                        pos = match_t.start()
+                        break
+            else:
+                pos = len(buffer)
+        raise KeyError("ro_property not found in: %s" % filepath)
+
+    @classmethod
+    def __iter_ro_property(cls, filepath: str, chunk_size: int):
+        decoder = json.JSONDecoder()
+        chunks = cls.__iter_json_chunk(filepath, chunk_size)
+        buffer = cls.__seek_ro_property(chunks, filepath)
+        # 逐个解码数组中的元素，只在缓冲区不足以解码一个元素时读取下一块
+        pos = 0
+        while True:
+            while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ','):
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                if pos == len(buffer):
+                    raise json.JSONDecodeError("Buffer is exhausted", buffer, pos)
+                prop, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    raise ValueError("Unterminated ro_property in: %s" % filepath)
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            if type(prop) is dict:
+                yield prop
+
+    # 常见的 start_display 格式，例如：Tue Aug 13 13:16:47 CST 2024
+    __common_time_pattern = re.compile(r'[A-Z][a-z]{2} ([A-Z][a-z]{2}) ([0-9]{1,2}) '
+                                       r'([0-9]{2}):([0-9]{2}):([0-9]{2}) ([A-Z]+) ([0-9]{4})')
+    __tz_pattern = re.compile(r'[A-Z]*[+-][0-9]+')
+    __sign_pattern = re.compile(r'[+-]')
+    __chinese_month_pattern = re.compile(r'[0-9]{1,2}月')
+    __tz_info = {
+        'CST': 'UTC+8',
+        'HKT': 'UTC+8',
+        'AST': 'UTC-4',
+        'MYT': 'UTC+8',
+    }
+    # 与 dateutil 解析 tzinfos 中字符串的方式相同，预先创建供快速路径使用
+    __tz_object = dict(map(lambda x: (x[0], dateutil.tz.tzstr(x[1])), __tz_info.items()))
+    __month_number = dict(map(lambda x: (x[1], x[0]), enumerate(calendar.month_abbr)))
+    __parser_info: dateparser.parserinfo | None = None
+
+    @classmethod
+    def __reverse_timezone(cls, time_str: str):
+        match_tz = cls.__tz_pattern.search(time_str)
         if match_tz is None:
             return time_str
         tz_str = match_tz.group()
-        match_sign = re.search(r'[+-]', tz_str)
+        match_sign = cls.__sign_pattern.search(tz_str)
         # if tz_str[:match_sign.start()] not in pytz.all_timezones:
         #     return time_str
         if tz_str[:match_sign.start()] == '':
@@ -79,7 +306,7 @@ class ReportLoader:
 
     @classmethod
     def __replace_month(cls, time_str: str):
-        match_m = re.search(r'[0-9]{1,2}月', time_str)
+        match_m = cls.__chinese_month_pattern.search(time_str)
         if match_m is None:
             return time_str
         cm = cls.AdditionParserInfo.CHINESE_MONTHS[int(match_m.group()[:-1]) - 1]
@@ -89,107 +316,163 @@ class ReportLoader:
         CHINESE_MONTHS = ['一月', '二月', '三月', '四月', '五月', '六月', '七月', '八月', '九月', '十月', '十一月',
                           '十二月']
         CHINESE_WEEKDAYS = ['周一', '周二', '周三', '周四', '周五', '周六', '周日']
+        # 在类定义时生成新的列表，不修改 dateutil.parser.parserinfo 的 MONTHS 与 WEEKDAYS
+        MONTHS = list(map(lambda x: x[0] + (x[1],), zip(dateparser.parserinfo.MONTHS, CHINESE_MONTHS)))
+        WEEKDAYS = list(map(lambda x: x[0] + (x[1],), zip(dateparser.parserinfo.WEEKDAYS, CHINESE_WEEKDAYS)))
 
-        def __init__(self):
-            months = self.MONTHS
-            assert len(self.CHINESE_MONTHS) == len(months)
-            for i in range(len(months)):
-                months[i] = months[i] + (self.CHINESE_MONTHS[i],)
-            self.MONTHS = months
-            weekdays = self.WEEKDAYS
-            assert len(self.CHINESE_WEEKDAYS) == len(weekdays)
-            for i in range(len(weekdays)):
-                weekdays[i] = weekdays[i] + (self.CHINESE_WEEKDAYS[i],)
-            self.WEEKDAYS = weekdays
-            super().__init__()
+    @classmethod
+    def __parse_common_time_str(cls, time_str: str):
+        match_t = cls.__common_time_pattern.fullmatch(time_str)
+        if match_t is None:
+            return None
+        month, day, hour, minute, second, tz_name, year = match_t.groups()
+        if month not in cls.__month_number.keys() or tz_name not in cls.__tz_object.keys():
+            return None
+        try:
+            return datetime.datetime(int(year), cls.__month_number[month], int(day), int(hour), int(minute),
+                                     int(second), tzinfo=cls.__tz_object[tz_name])
+        except ValueError:
+            return None
 
     @classmethod
+    @functools.lru_cache(maxsize=1024)
     def parse_time_str(cls, time_str: str):
-        tzinfo = {
-            'CST': 'UTC+8',
-            'HKT': 'UTC+8',
-            'AST': 'UTC-4',
-            'MYT': 'UTC+8',
-        }
+        # 同一批 Report 的 start_display 格式相同，解析结果按字符串缓存
+        parsed_time = cls.__parse_common_time_str(time_str)
+        if parsed_time is not None:
+            return parsed_time
+        if cls.__parser_info is None:
+            cls.__parser_info = cls.AdditionParserInfo()
         time_str = cls.__replace_month(cls.__reverse_timezone(time_str))
-        return dateparser.parse(time_str, tzinfos=tzinfo, parserinfo=cls.AdditionParserInfo())
+        return dateparser.parse(time_str, tzinfos=cls.__tz_info, parserinfo=cls.__parser_info)
 
 
 class ReportVerifier:
+    __space_pattern = re.compile(r'\s+')
+    __tag_pattern = re.compile(r'<.*?>')
+    __table_class = ('summary', 'testsummary', 'testdetails', 'incompletemodules')
+
     def __init__(self, html_file: str):
         self.__html = html_file
-        with ReportLoader.open_r_utf8(self.__html) as html_f:
-            self.__html_bs = BeautifulSoup(html_f, 'lxml')
+        # 每类表格中需要核对的单元格文本，summary、testsummary、incompletemodules 只取第一个表格
+        self.__summary_items: list[tuple[str, str]] | None = None
+        self.__module_items: list[str] | None = None
+        self.__failed_items: list[tuple[str, list[str]]] = []
+        self.__incomplete_items: list[str] | None = None
+        self.__load_tables()
 
     @staticmethod
-    def __clean_string(string: str):
+    def __text_of(elem: etree.ElementBase):
+        return ''.join(elem.itertext())
+
+    @staticmethod
+    def __class_of(elem: etree.ElementBase):
+        return (elem.get('class') or '').split()
+
+    def __load_tables(self):
+        # 流式解析 html，只提取需要核对的表格，其余内容（例如 failure details）读取后即释放
+        with utils.vfs.open_binary(self.__html) as html_f:
+            for _, table in etree.iterparse(html_f, events=('end',), tag='table', html=True, encoding='UTF-8',
+                                            huge_tree=True):
+                table_class = self.__class_of(table)
+                if 'summary' in table_class and self.__summary_items is None:
+                    self.__summary_items = self.__read_summary_table(table)
+                if 'testsummary' in table_class and self.__module_items is None:
+                    self.__module_items = list(map(lambda x: self.__clean_string(self.__text_of(x)), table.iter('td')))
+                if 'testdetails' in table_class:
+                    self.__failed_items.append(self.__read_details_table(table))
+                if 'incompletemodules' in table_class and self.__incomplete_items is None:
+                    self.__incomplete_items = list(map(lambda x: self.__clean_string(self.__text_of(x)),
+                                                       table.iter('td')))
+                # 嵌套在其他表格中的表格随最外层的表格一起释放
+                if next(table.iterancestors('table'), None) is None:
+                    table.clear(keep_tail=False)
+                    while table.getprevious() is not None:
+                        del table.getparent()[0]
+
+    def __read_summary_table(self, table: etree.ElementBase):
+        summary_items = []
+        for row_title in filter(lambda x: 'rowtitle' in self.__class_of(x), table.iter('td')):
+            # 与 row title 相邻的下一个元素为其值
+            value = row_title.getnext()
+            while value is not None and not isinstance(value.tag, str):
+                value = value.getnext()
+            if value is None:
+                raise ValueError("Summary value of %s not found in: %s." % (self.__text_of(row_title), self.__html))
+            summary_items.append((self.__text_of(row_title), self.__clean_string(self.__text_of(value))))
+        return summary_items
+
+    def __read_details_table(self, table: etree.ElementBase):
+        module_cell = next(filter(lambda x: 'module' in self.__class_of(x), table.iter('td')), None)
+        if module_cell is None:
+            raise ValueError("Module name of testdetails not found in: %s." % self.__html)
+        test_name_list = filter(lambda x: 'testname' in self.__class_of(x), table.iter('td'))
+        return self.__clean_string(self.__text_of(module_cell)), \
+            list(map(lambda x: self.__clean_string(self.__text_of(x)), test_name_list))
+
+    @classmethod
+    def __clean_string(cls, string: str):
         # string = re.sub(r'[\n\r]+', r'<br/>', string)
         # string = re.sub(r'[ \f\t\v]+', ' ', string)
-        string = re.sub(r'\s+', ' ', string)
-        string = re.sub(r'\s+$', '', string)
-        string = re.sub(r'^\s+', '', string)
-        string = re.sub(r'&amp;', '&', string)
-        string = re.sub(r'<br/>', '\n', string)
-        string = re.sub(r'<.*?>', '', string)
+        string = cls.__space_pattern.sub(' ', string).strip(' ')
+        string = string.replace('&amp;', '&').replace('<br/>', '\n')
+        string = cls.__tag_pattern.sub('', string)
         return string
 
     def verify_summary(self, summary: dict[str, str]):
-        items = self.__html_bs.find('table', attrs={'class': 'summary'}).find_all('td', attrs={'class': 'rowtitle'})
-        for row_title in items:
-            key = row_title.text
+        if self.__summary_items is None:
+            raise ValueError("Table of summary not found in: %s." % self.__html)
+        for key, value in self.__summary_items:
             if key not in summary.keys():
                 raise KeyError("Summary miss key: %s." % key)
-            value = self.__clean_string(row_title.find_next_sibling().text)
             if summary[key] != value:
                 raise ValueError("Summary value of %s verify failed: %s != %s." % (key, summary[key], value))
 
-    @staticmethod
-    def __list_module_name(module_list: list[Module]):
-        return list(map(lambda x: x.module_name, module_list))
-
-    def verify_module_result(self, module_list: list[Module]):
-        items = self.__html_bs.find('table', attrs={'class': 'testsummary'}).find_all('td')
-        module_name_list = self.__list_module_name(module_list)
-        index = None
-        for i, cell in enumerate(items):
-            content: str = self.__clean_string(cell.text)
+    def verify_module_result(self, module_dict: dict[str, Module], module_names: set[str] = None):
+        # 提供 module_names 时只核对其中的 module
+        if self.__module_items is None:
+            raise ValueError("Table of testsummary not found in: %s." % self.__html)
+        module = None
+        for i, content in enumerate(self.__module_items):
             col = i % 7 + 1
+            if col != 1 and module is None:
+                continue
             match col:
                 case 1:
-                    if content not in module_name_list:
+                    if module_names is not None and content not in module_names:
+                        module = None
+                        continue
+                    if content not in module_dict.keys():
                         raise ValueError("Miss module: %s." % content)
-                    index = module_name_list.index(content)
+                    module = module_dict[content]
                 case 2:
-                    assert module_list[index].case_passed_num == int(content)
+                    assert module.case_passed_num == int(content)
                 case 3:
-                    assert module_list[index].case_failed_num == int(content)
+                    assert module.case_failed_num == int(content)
                 case 4:
-                    assert module_list[index].case_assumption_failure_num == int(content)
+                    assert module.case_assumption_failure_num == int(content)
                 case 5:
-                    assert module_list[index].case_ignored_num == int(content)
+                    assert module.case_ignored_num == int(content)
                 case 6:
-                    assert module_list[index].case_total_num == int(content)
+                    assert module.case_total_num == int(content)
                 case 7:
-                    assert str(module_list[index].done_bool).upper() == content.upper()
+                    assert str(module.done_bool).upper() == content.upper()
                 case _:
                     raise ValueError("Unexpected match: %s." % col)
 
-    def verify_failed(self, module_list: list[Module]):
+    def verify_failed(self, module_dict: dict[str, Module], module_names: set[str] = None):
         failed_dict = {}
-        items = self.__html_bs.find_all('table', attrs={'class': 'testdetails'})
-        if not items:
+        if not self.__failed_items:
             return
-        module_name_list = self.__list_module_name(module_list)
-        for table in items:
-            module_name = self.__clean_string(table.find('td', attrs={'class': 'module'}).text)
+        for module_name, case_name_list in self.__failed_items:
+            if module_names is not None and module_name not in module_names:
+                continue
             failed_dict[module_name] = []
-            if module_name not in module_name_list:
+            if module_name not in module_dict.keys():
                 raise ValueError("Miss module: %s." % module_name)
-            test_name_list = table.find_all('td', attrs={'class': 'testname'})
-            for test_name in test_name_list:
-                case_name = self.__clean_string(test_name.text)
+            for case_name in case_name_list:
                 failed_dict[module_name].append(case_name)
-                case = module_list[module_name_list.index(module_name)].find_case_by_name(case_name)
+                case = module_dict[module_name].find_case_by_name(case_name)
                 if case is None:
                     raise ValueError("Miss case: %s in module %s." % (case_name, module_name))
                 case: Case
@@ -199,33 +482,21 @@ class ReportVerifier:
                                          % (case_name, module_name, case_result))
         return failed_dict
 
-    def verify_incomplete(self, module_list: list[Module]):
-        items = self.__html_bs.find('table', attrs={'class': 'incompletemodules'})
-        if not items:
+    def verify_incomplete(self, module_dict: dict[str, Module], module_names: set[str] = None):
+        if not self.__incomplete_items:
             return
-        module_name_list = self.__list_module_name(module_list)
-        for name in items.find_all('td'):
-            module_name = self.__clean_string(name.text)
-            if module_name not in module_name_list:
+        for module_name in self.__incomplete_items:
+            if module_names is not None and module_name not in module_names:
+                continue
+            if module_name not in module_dict.keys():
                 raise ValueError("Miss module: %s." % module_name)
-            module_result = module_list[module_name_list.index(module_name)].done_bool
+            module_result = module_dict[module_name].done_bool
             if module_result:
                 raise AssertionError("Module %s should be incomplete, but get done_bool: %s."
                                      % (module_name, module_result))
 
 
-class Report(Base):
-    __ro_property = [
-        "ro.software.version_id",
-        "ro.build.fingerprint",
-        "ro.oem.key1",
-        "ro.build.representative.fingerprint",
-        "ro.com.google.clientidbase",
-        "ro.vendor.build.fingerprint",
-        "ro.build.date",
-        "ro.build.version.security_patch",
-        "ro.build.version.incremental",
-    ]
+class ReportHead(Base):
     __key_RP = {
         'html_result': 'test_result_failures_suite.html',
         'all_result': 'test_result.html',
@@ -239,30 +510,31 @@ class Report(Base):
         'no_device_info': ["CTS_VERIFIER", 'STS'],
     }
 
-    def __init__(self, report_dir: str, identify_name: str = None, show_log=True):
+    def __init__(self, report_dir: str, xml_head: dict[str, dict[str, str]] = None):
         super().__init__()
-        self.identify_name = str(identify_name)
         self.__report_path = utils.absolute_path(report_dir)
-        with ReportLoader.open_r_utf8(self.__key_ap('xml_result')) as xml_f:
-            xml_bs = BeautifulSoup(xml_f, 'xml')
+        # 未提供 xml_head 时仅读取 test_result.xml 头部的 <Result>、<Summary>、<Build>
+        if xml_head is None:
+            xml_head = ReportLoader.load_xml_head(self.key_ap('xml_result'))
         try:
-            suite_name = xml_bs.find('Result')['suite_variant']
+            suite_name = xml_head['Result']['suite_variant']
         except KeyError as ke:
-            suite_name = xml_bs.find('Result')['suite_name']
+            suite_name = xml_head['Result']['suite_name']
             if suite_name not in self.__exemption['no_variant']:
                 raise ke
         self.__suite_name: str = suite_name
-        if show_log:
-            self.logger.info("Loading Report from: %s as [%s]" % (self.__report_path, self.__suite_name))
-        self.check_path(show_log)
-        self.__start_display = ReportLoader.parse_time_str(xml_bs.find('Result')['start_display'])
-        self.__start_timestamp = int(xml_bs.find('Result')['start']) / 1000
-        self.__summary = ReportLoader.load_summary_from_xml(xml_bs)
-        self.__module_list = ReportLoader.load_result_from_xml(xml_bs)
-        self.__device_info = ReportLoader.load_device_info(self.__key_ap('device_info'))
-        self.__verify(xml_bs)
-
-    def __key_ap(self, rp_key: str):
+        self.__start_display = ReportLoader.parse_time_str(xml_head['Result']['start_display'])
+        self.__start_timestamp = int(xml_head['Result']['start']) / 1000
+        self.__summary = ReportLoader.load_summary_from_xml(xml_head)
+        # 查找关键字到 summary key 的映射：已有的 key 直接命中，其余模糊匹配一次后缓存，None 表示未匹配
+        self.__summary_key: dict[str, str | None] = dict(map(lambda x: (x, x), self.__summary.keys()))
+        self.__summary_case_num = int(xml_head['Summary']['pass']) + int(xml_head['Summary']['failed'])
+
+    @classmethod
+    def key_path(cls, report_dir: str, rp_key: str):
+        return str(os.path.join(utils.absolute_path(report_dir), cls.__key_RP[rp_key]))
+
+    def key_ap(self, rp_key: str):
         return str(os.path.join(self.__report_path, self.__key_RP[rp_key]))
 
     def check_path(self, show_log=True):
@@ -274,8 +546,8 @@ class Report(Base):
             if self.__suite_name in self.__exemption['no_device_info']:
                 if key == 'device_info':
                     continue
-            key_ap = self.__key_ap(key)
-            if not os.path.exists(key_ap):
+            key_ap = self.key_ap(key)
+            if not utils.vfs.exists(key_ap):
                 if key == 'xml_result':
                     raise ValueError("Invalid Report path: [%s] does not exists." % value)
                 miss_rp.append(value)
@@ -288,46 +560,24 @@ class Report(Base):
 
     @classmethod
     def is_report(cls, report_dir: str):
-        report_path = utils.absolute_path(report_dir)
-        return os.path.exists(os.path.join(report_path, cls.__key_RP['xml_result']))
-
-    def __verify(self, xml_bs: bs4.BeautifulSoup):
-        # assert self.__start_time.timestamp() == int(xml_bs.find('Result')['start'][:-3])
-        assert len(set(self.module_name_list)) == len(self.__module_list)
-        summ = xml_bs.find('Summary')
-        assert int(summ['pass']) == sum(map(lambda x: x.case_passed_num, self.__module_list))
-        assert int(summ['failed']) == sum(map(lambda x: x.case_failed_num, self.__module_list))
-        assert int(summ['modules_done']) == self.module_done_num
-        assert int(summ['modules_total']) == self.module_total_num
-        html_file = self.__key_ap('html_result')
-        if os.path.exists(html_file):
-            report_verifier = ReportVerifier(html_file)
-            report_verifier.verify_summary(self.__summary)
-            report_verifier.verify_module_result(self.__module_list)
-            report_verifier.verify_failed(self.__module_list)
-            report_verifier.verify_incomplete(self.__module_list)
-
-    @classmethod
-    def filter_property(cls, prop_table: pd.DataFrame, on: str):
-        target_prop = pd.merge(pd.Series(cls.__ro_property, name=on), prop_table, how='left', on=on)
-        target_prop.fillna('/', inplace=True)
-        return target_prop
+        return utils.vfs.isfile(cls.key_path(report_dir, 'xml_result'))
 
     def search_summary(self, keyword: str):
-        key, score = fuzzysearch.extractOne(keyword, self.__summary.keys())
-        if score > 90:
-            return self.__summary[key]
-        else:
+        if keyword not in self.__summary_key.keys():
+            key, score = fuzzysearch.extractOne(keyword, self.__summary.keys())
+            self.__summary_key[keyword] = key if score > 90 else None
+        key = self.__summary_key[keyword]
+        if key is None:
             return None
+        return self.__summary[key]
 
-    def search_device_info(self, ro_property: str):
-        if self.__device_info is None:
-            return None
-        _, score, index = fuzzysearch.extractOne(ro_property, self.__device_info.iloc[:, 0])
-        if score > 90:
-            return str(self.__device_info.iloc[index, 1])
-        else:
-            return None
+    @property
+    def summary(self):
+        return dict(self.__summary)
+
+    @property
+    def summary_case_num(self):
+        return self.__summary_case_num
 
     @property
     def suite_name(self):
@@ -349,9 +599,197 @@ class Report(Base):
     def start_timestamp(self):
         return self.__start_timestamp
 
+    def get_summary_table(self):
+        summary_table = utils.dict2map(self.__summary)
+        return summary_table
+
+
+class ReportCounter(ReportHead):
+    def __init__(self, report_dir: str, show_log=True):
+        xml_file = self.key_path(report_dir, 'xml_result')
+        xml_head, self.__module_names, self.__module_done, self.__case_module, self.__case_names, \
+            self.__case_results = ReportLoader.load_xml_counts(xml_file)
+        super().__init__(report_dir, xml_head)
+        if show_log:
+            self.logger.info("Counting Report from: %s as [%s]" % (self.report_path, self.suite_name))
+        self.__verify(xml_head)
+
+    def __verify(self, xml_head: dict[str, dict[str, str]]):
+        summ = xml_head['Summary']
+        result_count = np.bincount(self.__case_results, minlength=len(CaseResult))
+        assert int(summ['pass']) == result_count[CaseResult.PASSED.result_id]
+        assert int(summ['failed']) == result_count[CaseResult.FAILED.result_id]
+        assert int(summ['modules_done']) == int(self.__module_done.sum())
+        assert int(summ['modules_total']) == len(self.__module_names)
+
     @property
     def module_name_list(self):
-        return list(map(lambda x: x.module_name, self.__module_list))
+        return list(self.__module_names)
+
+    @property
+    def module_total_case_num(self):
+        return self.__case_results.shape[0]
+
+    @property
+    def case_module(self):
+        return self.__case_module
+
+    @property
+    def case_names(self):
+        return self.__case_names
+
+    @property
+    def case_results(self):
+        return self.__case_results
+
+    def generate_module_done_array(self):
+        return self.__module_done.copy()
+
+    def get_module_case_note(self):
+        suite_build = self.search_summary('Suite / Build')
+        # case 按 module 顺序连续排列
+        case_bound = np.concatenate([[0], np.cumsum(np.bincount(self.__case_module,
+                                                                minlength=len(self.__module_names)))])
+
+        def module_name_cases_note(i: int):
+            return self.__module_names[i], '\n'.join(self.__case_names[case_bound[i]:case_bound[i + 1]])
+
+        models_case = list(map(lambda x: "[%s]\n%s" % module_name_cases_note(x), range(len(self.__module_names))))
+        return '\n'.join(["{%s}" % suite_build] + models_case)
+
+
+class Report(ReportHead):
+    __ro_property = [
+        "ro.software.version_id",
+        "ro.build.fingerprint",
+        "ro.oem.key1",
+        "ro.build.representative.fingerprint",
+        "ro.com.google.clientidbase",
+        "ro.vendor.build.fingerprint",
+        "ro.build.date",
+        "ro.build.version.security_patch",
+        "ro.build.version.incremental",
+    ]
+
+    __cache_rp = ['xml_result', 'html_result', 'device_info']
+
+    def __init__(self, report_dir: str, identify_name: str = None, show_log=True, stream=True,
+                 cache: ReportCache = None, skip_modules: set[str] = None, verify_policy: VerifyPolicy = None,
+                 ro_property: list[str] = None, file_digests: list[bytes | None] = None):
+        self.identify_name = str(identify_name)
+        # device info 中保留的属性，未提供时使用默认的目标属性
+        ro_property = self.default_ro_property() if ro_property is None else list(ro_property)
+        cache_files = self.cache_file_list(report_dir)
+        # 缓存中保存核对时的级别，不满足本次的级别时重新解析并核对
+        self.__verified_level = VerifyPolicy.level_of(verify_policy)
+        if cache is not None and self.__load_from_cache(report_dir, cache, cache_files, ro_property, show_log):
+            return
+        # 未提供 verify_policy 时完整核对；已核对过的 Report 按 trusted 处理
+        verify_level, digest = VerifyLevel.FULL, None
+        # 写入缓存与记录核对结果共用一次读取得到的文件哈希，file_digests 已提供时不再读取文件
+        if file_digests is None and (cache is not None or (verify_policy is not None and verify_policy.recording)):
+            file_digests = ReportCache.file_digests(cache_files)
+        if verify_policy is not None:
+            verify_level, digest = verify_policy.resolve(cache_files, file_digests=file_digests)
+        xml_file = self.key_path(report_dir, 'xml_result')
+        xml_head, self.__case_store, self.__module_list = ReportLoader.load_xml(
+            xml_file, stream=stream, skip_modules=skip_modules, verify=verify_level is not VerifyLevel.TRUSTED)
+        self.__module_index: dict[str, Module] = dict(map(lambda x: (x.module_name, x), self.__module_list))
+        super().__init__(report_dir, xml_head)
+        if show_log:
+            self.logger.info("Loading Report from: %s as [%s]" % (self.report_path, self.suite_name))
+        self.check_path(show_log)
+        self.__ro_property_list = ro_property
+        self.__device_info = ReportLoader.load_device_info(self.key_ap('device_info'), ro_property=ro_property)
+        self.__device_info_index = self.__create_device_info_index(self.__device_info)
+        self.__verify(xml_head, verify_level, verify_policy)
+        if digest is not None:
+            verify_policy.record(digest, verify_level)
+        if cache is not None:
+            cache.save(self.report_path, cache_files, self.__cache_state(), file_digests=file_digests)
+
+    @classmethod
+    def cache_file_list(cls, report_dir: str):
+        return list(map(lambda x: cls.key_path(report_dir, x), cls.__cache_rp))
+
+    def __cache_state(self):
+        return dict(filter(lambda x: x[0] != 'identify_name', self.__dict__.items()))
+
+    def __load_from_cache(self, report_dir: str, cache: ReportCache, cache_files: list[str], ro_property: list[str],
+                          show_log=True):
+        state = cache.load(utils.absolute_path(report_dir), cache_files)
+        if state is None:
+            return False
+        # 缓存的 device info 按其他目标属性提取时重新解析
+        if state.get('_Report__ro_property_list') != ro_property:
+            return False
+        if not VerifyPolicy.is_covered(self.__verified_level, state.get('_Report__verified_level')):
+            return False
+        self.config()
+        self.__dict__.update(state)
+        if show_log:
+            self.logger.info("Loading Report from cache: %s as [%s]" % (self.report_path, self.suite_name))
+        self.check_path(show_log)
+        return True
+
+    def __verify(self, xml_head: dict[str, dict[str, str]], verify_level: VerifyLevel = VerifyLevel.FULL,
+                 verify_policy: VerifyPolicy = None):
+        if verify_level is VerifyLevel.TRUSTED:
+            return
+        # assert self.start_datetime.timestamp() == int(xml_head['Result']['start'][:-3])
+        assert len(self.__module_index) == len(self.__module_list)
+        summ = xml_head['Summary']
+        assert int(summ['pass']) == sum(map(lambda x: x.case_passed_num, self.__module_list))
+        assert int(summ['failed']) == sum(map(lambda x: x.case_failed_num, self.__module_list))
+        assert int(summ['modules_done']) == self.module_done_num
+        assert int(summ['modules_total']) == self.module_total_num
+        html_file = self.key_ap('html_result')
+        if utils.vfs.isfile(html_file):
+            # sampled 时只与 html 核对随机抽取的 module
+            module_names = None
+            if verify_level is VerifyLevel.SAMPLED:
+                module_names = verify_policy.sample_modules(self.module_name_list)
+            report_verifier = ReportVerifier(html_file)
+            report_verifier.verify_summary(self.summary)
+            report_verifier.verify_module_result(self.__module_index, module_names=module_names)
+            report_verifier.verify_failed(self.__module_index, module_names=module_names)
+            report_verifier.verify_incomplete(self.__module_index, module_names=module_names)
+
+    @classmethod
+    def default_ro_property(cls):
+        return list(cls.__ro_property)
+
+    @classmethod
+    def filter_property(cls, prop_table: pd.DataFrame, on: str, ro_property: list[str] = None):
+        if ro_property is None:
+            ro_property = cls.__ro_property
+        target_prop = pd.merge(pd.Series(ro_property, name=on), prop_table, how='left', on=on)
+        target_prop.fillna('/', inplace=True)
+        return target_prop
+
+    @staticmethod
+    def __create_device_info_index(device_info: pd.DataFrame | None):
+        # ro property 到行号的映射，与 summary 相同：已有的 property 直接命中，模糊匹配的结果按需缓存
+        device_info_index: dict[str, int | None] = dict()
+        if device_info is not None:
+            for index, ro_property in enumerate(device_info.iloc[:, 0]):
+                device_info_index.setdefault(ro_property, index)
+        return device_info_index
+
+    def search_device_info(self, ro_property: str):
+        if self.__device_info is None:
+            return None
+        if ro_property not in self.__device_info_index.keys():
+            _, score, index = fuzzysearch.extractOne(ro_property, self.__device_info.iloc[:, 0])
+            self.__device_info_index[ro_property] = index if score > 90 else None
+        index = self.__device_info_index[ro_property]
+        if index is None:
+            return None
+        return str(self.__device_info.iloc[index, 1])
+
+    @property
+    def module_name_list(self):
+        return list(self.__module_index.keys())
 
     @property
     def module_total_num(self):
@@ -372,11 +810,12 @@ class Report(Base):
     def module_total_case_num(self):
         return sum(map(lambda x: x.case_total_num, self.__module_list))
 
+    @property
+    def case_store(self):
+        return self.__case_store
+
     def find_module_by_name(self, module_name: str):
-        if module_name in self.module_name_list:
-            return self.__module_list[self.module_name_list.index(module_name)]
-        else:
-            return None
+        return self.__module_index.get(module_name)
 
     def find_case_by_module_case_name(self, module_name: str, case_name: str):
         module = self.find_module_by_name(module_name)
@@ -387,22 +826,40 @@ class Report(Base):
             return None
         return case
 
-    def generate_module_done_map(self):
-        def name_done(module: Module):
-            return module.module_name, module.done_bool
-
-        module_done_map = pd.DataFrame(list(map(lambda x: name_done(x), self.__module_list)))
-        return module_done_map
-
-    def get_summary_table(self):
-        summary_table = utils.dict2map(self.__summary)
-        return summary_table
+    def intern_by(self, table: InternTable):
+        for module in self.__module_list:
+            module.intern_by(table)
+        self.__module_index = dict(map(lambda x: (x.module_name, x), self.__module_list))
+
+    def generate_case_result_table(self):
+        # module 与 case 均以 InternTable 的 id 表示，套件内各 Report 的 id 可直接比较
+        table = self.__case_store.intern_table
+        if table is None:
+            raise ValueError("Report should be interned before generating case result table: %s" % self.report_path)
+        # 各 module 的 case 在 store 中按 module 顺序连续存放，据此展开每行所属的 module
+        module_ids = np.repeat(table.intern_array(self.module_name_list),
+                               list(map(lambda x: x.case_total_num, self.__module_list)))
+        case_result_table = pd.DataFrame({
+            'module_id': module_ids,
+            'case_id': self.__case_store.name_ids(0, self.__case_store.size),
+            'result': self.__case_store.results(0, self.__case_store.size),
+        })
+        return case_result_table
+
+    def generate_passed_module_set(self):
+        # 已完成且 case 全部通过的 module
+        passed_module = filter(lambda x: x.done_bool and x.case_passed_num == x.case_total_num, self.__module_list)
+        return set(map(lambda x: x.module_name, passed_module))
+
+    def generate_module_done_array(self):
+        # 与 module_name_list 顺序一致
+        return np.fromiter(map(lambda x: x.done_bool, self.__module_list), dtype=bool, count=len(self.__module_list))
 
     def get_device_info_table(self):
         if self.__device_info is None:
             return None
         device_info_table = self.__device_info.copy()
-        device_info_table.columns = ['ro_property', self.__suite_name]
+        device_info_table.columns = ['ro_property', self.suite_name]
         return device_info_table
 
     def get_module_case_note(self):
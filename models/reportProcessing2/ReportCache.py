@@ -0,0 +1,145 @@
+import os
+import hashlib
+import pickle
+from .Base import Base
+from . import utils
+
+CACHE_DIR = r".\runtime cache"
+
+
+class ReportCache(Base):
+    __version = 11
+    __suffix = '.report'
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_size: int = 2 * 1024 ** 3):
+        super().__init__()
+        if max_size <= 0:
+            raise ValueError("The max_size of ReportCache should be positive, but given: %s" % max_size)
+        self.__cache_dir = utils.absolute_path(cache_dir)
+        self.__max_size = max_size
+        if not os.path.exists(self.__cache_dir):
+            os.makedirs(self.__cache_dir)
+
+    @property
+    def cache_dir(self):
+        return self.__cache_dir
+
+    def __entry_path(self, report_path: str):
+        key = hashlib.sha1(utils.absolute_path(report_path).encode('UTF-8')).hexdigest()
+        return os.path.join(self.__cache_dir, key + self.__suffix)
+
+    @staticmethod
+    def file_identity(file_list: list[str]):
+        identity = []
+        for file in file_list:
+            if utils.vfs.isfile(file):
+                identity.append((file, *utils.vfs.file_identity(file)))
+            else:
+                identity.append((file, None, None))
+        return tuple(identity)
+
+    @staticmethod
+    def file_digests(file_list: list[str], chunk_size: int = 1024 ** 2):
+        # 各文件内容的哈希，不存在的文件为 None；缓存与核对记录的 content_hash 均由其组合，文件只需读取一次
+        digest_list: list[bytes | None] = []
+        for file in file_list:
+            if not utils.vfs.isfile(file):
+                digest_list.append(None)
+                continue
+            digest = hashlib.blake2b()
+            with utils.vfs.open_binary(file) as f:
+                while chunk := f.read(chunk_size):
+                    digest.update(chunk)
+            digest_list.append(digest.digest())
+        return digest_list
+
+    @classmethod
+    def content_hash(cls, file_list: list[str], with_path=True, file_digests: list[bytes | None] = None):
+        # with_path 为 False 时只计入文件名，复制到其他位置的 Report 哈希不变
+        if file_digests is None:
+            file_digests = cls.file_digests(file_list)
+        digest = hashlib.blake2b()
+        for file, file_digest in zip(file_list, file_digests):
+            digest.update((file if with_path else os.path.basename(file)).encode('UTF-8'))
+            digest.update(b'\x00' if file_digest is None else file_digest)
+        return digest.hexdigest()
+
+    def load(self, report_path: str, file_list: list[str]):
+        entry = self.__entry_path(report_path)
+        if not os.path.exists(entry):
+            return None
+        try:
+            with open(entry, 'rb') as f:
+                header: dict = pickle.load(f)
+                if header.get('version') != self.__version:
+                    raise ValueError("Outdated cache version: %s." % header.get('version'))
+                identity = self.file_identity(file_list)
+                if header['identity'] != identity:
+                    # 文件属性变化（例如重新解压）时，按内容哈希确认缓存是否仍然有效
+                    if header['digest'] != self.content_hash(file_list):
+                        raise ValueError("Content of Report has been changed.")
+                    header['identity'] = identity
+                    state = pickle.load(f)
+                    self.__write(entry, header, state)
+                else:
+                    state = pickle.load(f)
+        except (ValueError, KeyError, EOFError, pickle.UnpicklingError) as e:
+            self.logger.info("Invalidate cache of Report: %s\n\t%s", report_path, e)
+            self.invalidate(report_path)
+            return None
+        # 更新访问时间作为淘汰依据
+        os.utime(entry)
+        return state
+
+    def save(self, report_path: str, file_list: list[str], state: dict, file_digests: list[bytes | None] = None):
+        header = {
+            'version': self.__version,
+            'report_path': utils.absolute_path(report_path),
+            'identity': self.file_identity(file_list),
+            'digest': self.content_hash(file_list, file_digests=file_digests),
+        }
+        self.__write(self.__entry_path(report_path), header, state)
+        self.evict()
+
+    @staticmethod
+    def __write(entry: str, header: dict, state: dict):
+        temp = '%s.%d.tmp' % (entry, os.getpid())
+        with open(temp, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, entry)
+
+    def invalidate(self, report_path: str):
+        entry = self.__entry_path(report_path)
+        if os.path.exists(entry):
+            os.remove(entry)
+
+    def __list_entries(self):
+        entry_list = filter(lambda x: x.endswith(self.__suffix), os.listdir(self.__cache_dir))
+        return list(map(lambda x: os.path.join(self.__cache_dir, x), entry_list))
+
+    def clear(self):
+        for entry in self.__list_entries():
+            os.remove(entry)
+
+    def evict(self):
+        entry_list = self.__list_entries()
+        # 按最近访问时间由远到近淘汰，直至总大小不超过 max_size
+        entry_stat = []
+        for entry in entry_list:
+            try:
+                entry_stat.append((entry, os.stat(entry)))
+            except FileNotFoundError:
+                # 其他进程可能已经淘汰了该条目
+                continue
+        entry_stat.sort(key=lambda x: x[1].st_mtime)
+        total_size = sum(map(lambda x: x[1].st_size, entry_stat))
+        for entry, stat in entry_stat:
+            if total_size <= self.__max_size:
+                break
+            total_size -= stat.st_size
+            try:
+                os.remove(entry)
+            except FileNotFoundError:
+                continue
+            self.logger.info("Evict cache entry: %s", entry)
@@ -1,23 +1,30 @@
 import os
-from .Report import Report
+from .Report import Report, ReportHead
+from .ReportCache import ReportCache
+from .VerifyPolicy import VerifyPolicy, VerifyLevel
 from . import utils
 
 
 class ReportPath:
-    def __init__(self, report: Report, keep_report=False):
+    __slots__ = ('__real', '__logical', '__suite_name', '__miss_rp', '__dir_name', '__report')
+
+    def __init__(self, report: ReportHead, keep_report=False):
         self.__real = report.report_path
         self.__logical = self.__real
         self.__suite_name = report.suite_name
         self.__miss_rp = report.check_path(show_log=False)
         self.__dir_name = report.start_datetime.strftime('%Y.%m.%d_%H.%M.%S')
         if keep_report:
+            if not isinstance(report, Report):
+                raise TypeError("Only the fully loaded Report can be kept in ReportPath, but given: %s."
+                                % type(report))
             self.__report = report
         else:
             self.__report = None
 
     def update_logical(self, base_path: str, replace_path: str):
         utils.CheckPath.assert_start_with(self.__logical, base_path)
-        self.__logical = '::'.join([replace_path, self.__logical[len(base_path):]])
+        self.__logical = utils.vfs.join_archive(replace_path, self.__logical[len(base_path):])
 
     @property
     def real(self):
@@ -48,37 +55,62 @@ class ReportPath:
 
 
 class ReportFinder:
-    def __init__(self, target_path: str, flag_keep_report=False):
+    def __init__(self, target_path: str, flag_keep_report=False, verify_policy: VerifyPolicy = None,
+                 ro_property: list[str] = None):
         if not os.path.exists(target_path):
             raise ValueError("The target_path is not exists, ReportFinder unable to start working.")
         self.__flag_keep_report = flag_keep_report
+        self.__verify_policy = verify_policy
+        self.__ro_property = ro_property
         self.__target = utils.absolute_path(target_path)
         self.__temp = utils.SafePath.avoid_duplicate(utils.absolute_path('temp'))
         utils.CheckPath.assert_not_existed(self.__temp)
         self.rp_list = self.__walk_dir(self.__target)
 
     def __walk_dir(self, dir_path: str):
-        root, dirs, files = next(os.walk(dir_path))
+        root, dirs, files = next(utils.vfs.walk(dir_path))
         if Report.is_report(root):
             print("Found Report in: %s, Analyzing and generating ReportPath ..." % root)
-            return [ReportPath(Report(root, show_log=False), keep_report=self.__flag_keep_report)]
+            # 不需要保留且不需要核对 Report 时只读取 test_result.xml 的头部
+            need_verify, file_digests = self.__need_verify(root)
+            if self.__flag_keep_report or need_verify:
+                report = Report(root, show_log=False, verify_policy=self.__verify_policy,
+                                ro_property=self.__ro_property, file_digests=file_digests)
+            else:
+                report = ReportHead(root)
+            return [ReportPath(report, keep_report=self.__flag_keep_report)]
         rp_list = []
         for fn in files:
-            rp_list += self.__walk_file(os.path.join(root, fn))
+            rp_list += self.__walk_file(utils.vfs.join(root, fn))
         for dn in dirs:
-            rp_list += self.__walk_dir(os.path.join(root, dn))
+            rp_list += self.__walk_dir(utils.vfs.join(root, dn))
         return rp_list
 
+    def __need_verify(self, report_dir: str):
+        # 返回是否需要核对及查找核对结果时读取的文件哈希，创建 Report 时沿用，每个 Report 的文件只读取一次
+        if self.__verify_policy is None:
+            return True, None
+        file_list = Report.cache_file_list(report_dir)
+        file_digests = ReportCache.file_digests(file_list) if self.__verify_policy.recording else None
+        verify_level, _ = self.__verify_policy.resolve(file_list, file_digests=file_digests)
+        return verify_level is not VerifyLevel.TRUSTED, file_digests
+
     def __walk_file(self, file_path: str):
-        if not utils.is_package(file_path):
+        if not utils.vfs.is_package(file_path):
             return []
-        unpack_dir = utils.path_basename(file_path) + '_'
-        unpack_path = utils.SafePath.avoid_duplicate(str(os.path.join(self.__temp, unpack_dir)))
+        # 压缩包不解压，按虚拟路径在包内搜索
+        if not utils.vfs.is_virtual(file_path):
+            return self.__walk_dir(utils.vfs.join_archive(file_path))
+        # 嵌套在压缩包内的压缩包只解压该文件本身
+        if not os.path.exists(self.__temp):
+            os.makedirs(self.__temp)
+        unpack_file = utils.vfs.split_archive(file_path)[1].rsplit('/', 1)[-1]
+        unpack_path = utils.SafePath.avoid_duplicate(str(os.path.join(self.__temp, unpack_file)))
         utils.CheckPath.assert_not_existed(unpack_path)
-        utils.extract(file_path, unpack_path)
-        rp_list = self.__walk_dir(unpack_path)
+        utils.vfs.extract_file(file_path, unpack_path)
+        rp_list = self.__walk_dir(utils.vfs.join_archive(unpack_path))
         for rp in rp_list:
-            rp.update_logical(unpack_path, file_path)
+            rp.update_logical(utils.vfs.join_archive(unpack_path), file_path)
         return rp_list
 
     def report_path_found(self, show_print=True):
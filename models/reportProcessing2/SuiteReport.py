@@ -1,27 +1,56 @@
 import os
 import shutil
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable
 import pandas as pd
 import numpy as np
 from .Base import Base
-from .Report import Report
+from .Report import Report, ReportHead
+from .ReportCache import ReportCache
+from .MergeState import MergeState
+from .VerifyPolicy import VerifyPolicy
 from . import utils
-from .ModuleCase import CaseNum, ModuleNum, CaseResult, Case, Module
+from .ModuleCase import CaseNum, ModuleNum, CaseResult, Case, InternTable
 from . import workbookProcess as wbP
 
 
 class SuiteReport(Base):
     __unpack_dir = '.unpack'
+    # (module id, case id) 合为一个 int64 key，id 均小于 2 ** 32
+    __key_shift = 32
 
-    def __init__(self, suite_dir: str, flag_unpack=False):
+    def __init__(self, suite_dir: str, flag_unpack=False, cache: ReportCache = None, jobs: int = 1,
+                 executor: Executor = None, report_head_list: list[ReportHead] = None, incremental=False,
+                 selective=False, compress_details=False, verify_policy: VerifyPolicy = None,
+                 ro_property: list[str] = None):
         self.wrong_spl = False
         self.inconsistent_summary: list[str] = []
         super().__init__()
         self.__suite_path = utils.absolute_path(suite_dir)
-        report_path_list = self.valid_report_path(self.__suite_path, flag_unpack=flag_unpack)
-        if len(report_path_list) == 0:
+        if report_head_list is None:
+            report_head_list = self.valid_report_head(self.__suite_path, flag_unpack=flag_unpack)
+        if len(report_head_list) == 0:
             raise NoReportException
-        self.__main_report, self.__all_reports = self.__load_suite_report(report_path_list)
-        self.__has_failed_record, self.__case_num = self.__merge_update_cases()
+        self.__intern_table = InternTable(compress=compress_details)
+        # device info 中保留的属性，未提供时使用 Report 的默认目标属性
+        ro_property = Report.default_ro_property() if ro_property is None else list(ro_property)
+        merge_state = MergeState(self.__suite_path) if incremental else None
+        # 增量模式下仅解析新增的 Report 并合入已保存的合并状态，无法合入时完整重建
+        if merge_state is None or not self.__load_merge_state(merge_state, report_head_list, cache=cache, jobs=jobs,
+                                                              executor=executor, selective=selective,
+                                                              verify_policy=verify_policy, ro_property=ro_property):
+            self.__main_report, self.__all_reports = self.__load_suite_report(report_head_list, cache=cache,
+                                                                              jobs=jobs, executor=executor,
+                                                                              selective=selective,
+                                                                              verify_policy=verify_policy,
+                                                                              ro_property=ro_property)
+            self.__case_matrix = self.__generate_case_result_matrix()
+            self.__module_matrix = self.__generate_module_done_matrix()
+            if merge_state is not None:
+                self.__save_merge_state(merge_state, selective=selective, verify_policy=verify_policy,
+                                        ro_property=ro_property)
+        self.__has_failed_record, self.__report_record_index, self.__case_num = self.__merge_update_cases()
         self.__incomplete, self.__module_num = self.__merge_update_modules()
         self.__verity()
         self.__summary_diff = self.__inspect_summary()
@@ -35,8 +64,6 @@ class SuiteReport(Base):
         # 搜索文件夹和文件
         root, dirs, files = next(os.walk(suite_path))
         report_path_list = []
-        if flag_unpack:
-            os.mkdir(unpack_path)
         for dfn in dirs + files:
             dfn_path = str(os.path.join(root, dfn))
             report_path_list += cls.__recursive_search(dfn_path, unpack_path, flag_unpack=flag_unpack)
@@ -44,30 +71,36 @@ class SuiteReport(Base):
 
     @classmethod
     def __recursive_search(cls, path: str, unpack_path: str, flag_unpack=False):
-        def extract(_root: str, _fn: str):
-            _from = os.path.join(_root, _fn)
-            _to = os.path.join(unpack_path, _fn + '_')
+        def extract(_path: str):
+            # 嵌套在压缩包内的压缩包只解压该文件本身
+            if not os.path.exists(unpack_path):
+                os.mkdir(unpack_path)
+            _to = os.path.join(unpack_path, utils.vfs.split_archive(_path)[1].rsplit('/', 1)[-1])
             _to = utils.SafePath.avoid_duplicate(str(_to))
             utils.CheckPath.assert_not_existed(_to)
-            utils.extract(_from, _to)
+            utils.vfs.extract_file(_path, _to)
             return _to
 
-        # 判定文件夹或文件
-        if os.path.isfile(path):
-            if flag_unpack and utils.is_package(path):
-                path = extract(*utils.split_end(path))
+        # 判定文件夹或文件，压缩包不解压，按虚拟路径在包内搜索
+        if utils.vfs.isfile(path):
+            if flag_unpack and utils.vfs.is_package(path):
+                path = utils.vfs.join_archive(extract(path) if utils.vfs.is_virtual(path) else path)
             else:
                 return []
         if Report.is_report(path):
             return [path]
         # 递归搜索
-        root, dirs, files = next(os.walk(path))
+        root, dirs, files = next(utils.vfs.walk(path))
         path_list = []
         for dfn in dirs + files:
-            dfn_path = str(os.path.join(root, dfn))
+            dfn_path = utils.vfs.join(root, dfn)
             path_list += cls.__recursive_search(dfn_path, unpack_path, flag_unpack=flag_unpack)
         return path_list
 
+    @classmethod
+    def valid_report_head(cls, suite_path: str, flag_unpack=False):
+        return list(map(lambda x: ReportHead(x), cls.valid_report_path(suite_path, flag_unpack=flag_unpack)))
+
     @classmethod
     def is_suite_report(cls, suite_path: str, flag_unpack=False):
         if cls.valid_report_path(suite_path, flag_unpack=flag_unpack):
@@ -76,37 +109,161 @@ class SuiteReport(Base):
             return False
 
     @staticmethod
-    def __load_suite_report(path_list: list[str]):
-        loaded_report = []
-        # 加载 Report
-        for path in path_list:
-            report = Report(path)
-            loaded_report.append(report)
-        # 按报告创建时间戳由小到大（由旧到新）排序
-        loaded_report.sort(key=lambda x: x.start_timestamp, reverse=False)
+    def elect_main(report_list: list[ReportHead], case_num: Callable[[ReportHead], int]):
         max_num = 0
-        main_report_index = 0
-        # 查找 main_report：用例数最多的同时最旧的报告
-        for i, report in enumerate(loaded_report):
-            case_total_num = report.module_total_case_num
-            if case_total_num > max_num:
-                max_num = case_total_num
-                main_report_index = i
-        main_report = loaded_report[main_report_index]
-        suite_name = main_report.suite_name
-        valid_report = []
-        # 筛选 suite_name 与 main Report 一致的 Report
-        for report in loaded_report:
-            if report.suite_name == suite_name:
-                valid_report.append(report)
+        main_index = 0
+        # 查找 main_report：用例数最多的同时最旧的报告（report_list 须已按时间戳由旧到新排序）
+        for i, report in enumerate(report_list):
+            total_num = case_num(report)
+            if total_num > max_num:
+                max_num = total_num
+                main_index = i
+        return report_list[main_index]
+
+    @classmethod
+    def elect_suite_name(cls, head_list: list[ReportHead]):
+        if len(head_list) == 0:
+            raise NoReportException
+        head_list = sorted(head_list, key=lambda x: x.start_timestamp, reverse=False)
+        return cls.elect_main(head_list, lambda x: x.summary_case_num).suite_name
+
+    @classmethod
+    def select_report_head(cls, head_list: list[ReportHead]):
+        # 按报告创建时间戳由小到大（由旧到新）排序
+        head_list = sorted(head_list, key=lambda x: x.start_timestamp, reverse=False)
+        # 完整解析之前，按头部 Summary 的用例数推选 main_report，并筛选 suite_name 与之一致的 Report
+        main_head = cls.elect_main(head_list, lambda x: x.summary_case_num)
+        valid_head = list(filter(lambda x: x.suite_name == main_head.suite_name, head_list))
+        return main_head, valid_head
+
+    @staticmethod
+    def __load_report(path_list: list[str], cache: ReportCache = None, jobs: int = 1, executor: Executor = None,
+                      skip_modules: set[str] = None, verify_policy: VerifyPolicy = None, ro_property: list[str] = None):
+        # 使用给定的 executor 或在 jobs > 1 时使用进程池并行解析，结果顺序与 path_list 一致
+        load_report = functools.partial(Report, cache=cache, skip_modules=skip_modules, verify_policy=verify_policy,
+                                        ro_property=ro_property)
+        if executor is not None:
+            return list(executor.map(load_report, path_list))
+        elif jobs > 1 and len(path_list) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(path_list))) as executor:
+                return list(executor.map(load_report, path_list))
+        else:
+            return list(map(load_report, path_list))
+
+    @staticmethod
+    def __assign_identify_name(report_list: list[Report], main_report: Report):
         # 按报告顺序添加 identify_name
-        for i, report in enumerate(valid_report):
+        for i, report in enumerate(report_list):
             if report is main_report:
                 report.identify_name = 'main'
             else:
                 report.identify_name = str(i)
+
+    def __elect_loaded_main(self, priority_head: list[ReportHead], valid_head: list[ReportHead],
+                            loaded_report: list[Report]):
+        # 各 Report 在子进程中解析，合并前再统一驻留到套件的 InternTable
+        for report in loaded_report:
+            report.intern_by(self.__intern_table)
+        loaded_dict = dict(zip(map(id, priority_head), loaded_report))
+        valid_report: list[Report] = list(map(lambda x: loaded_dict[id(x)], valid_head))
+        # Summary 不含 ASSUMPTION_FAILURE 和 IGNORED 的数量，按完整解析后的用例数复核 main_report
+        return self.elect_main(valid_report, lambda x: x.module_total_case_num), valid_report
+
+    def __load_suite_report(self, head_list: list[ReportHead], cache: ReportCache = None, jobs: int = 1,
+                            executor: Executor = None, selective=False, verify_policy: VerifyPolicy = None,
+                            ro_property: list[str] = None):
+        main_head, valid_head = self.select_report_head(head_list)
+        # 按优先级加载 Report：main_report 优先，其余按时间戳
+        priority_head = [main_head] + list(filter(lambda x: x is not main_head, valid_head))
+        path_list = list(map(lambda x: x.report_path, priority_head))
+        if selective and len(path_list) > 1:
+            # 先解析 main_report，其余 Report 中 main_report 已完成且全部通过的 module 不读取 failure details
+            loaded_report = self.__load_report(path_list[:1], cache=cache, verify_policy=verify_policy,
+                                               ro_property=ro_property)
+            loaded_report[0].intern_by(self.__intern_table)
+            loaded_report += self.__load_report(path_list[1:], cache=cache, jobs=jobs, executor=executor,
+                                                skip_modules=loaded_report[0].generate_passed_module_set(),
+                                                verify_policy=verify_policy, ro_property=ro_property)
+        else:
+            loaded_report = self.__load_report(path_list, cache=cache, jobs=jobs, executor=executor,
+                                               verify_policy=verify_policy, ro_property=ro_property)
+        main_report, valid_report = self.__elect_loaded_main(priority_head, valid_head, loaded_report)
+        if main_report is not loaded_report[0]:
+            self.logger.warning("Main Report of [%s] is re-elected by total case num after loading: %s -> %s",
+                                main_head.suite_name, main_head.report_path, main_report.report_path)
+            if selective and len(path_list) > 1:
+                # 跳过的 module 按头部推选的 main_report 确定，重新推选后其余 Report 改为完整解析
+                loaded_report[1:] = self.__load_report(path_list[1:], cache=cache, jobs=jobs, executor=executor,
+                                                       verify_policy=verify_policy, ro_property=ro_property)
+                main_report, valid_report = self.__elect_loaded_main(priority_head, valid_head, loaded_report)
+        self.__assign_identify_name(valid_report, main_report)
         return main_report, valid_report
 
+    @staticmethod
+    def __report_file_dict(report_list: list[ReportHead]):
+        return dict(map(lambda x: (x.report_path, Report.cache_file_list(x.report_path)), report_list))
+
+    def __save_merge_state(self, merge_state: MergeState, selective=False, verify_policy: VerifyPolicy = None,
+                           ro_property: list[str] = None):
+        state = {
+            'main_report': self.__main_report,
+            'all_reports': self.__all_reports,
+            'case_matrix': self.__case_matrix,
+            'module_matrix': self.__module_matrix,
+            'intern_table': self.__intern_table,
+        }
+        merge_state.save(self.__report_file_dict(self.__all_reports), state, selective=selective,
+                         ro_property=ro_property, verify_level=VerifyPolicy.level_of(verify_policy))
+
+    def __load_merge_state(self, merge_state: MergeState, head_list: list[ReportHead], cache: ReportCache = None,
+                           jobs: int = 1, executor: Executor = None, selective=False,
+                           verify_policy: VerifyPolicy = None, ro_property: list[str] = None):
+        main_head, valid_head = self.select_report_head(head_list)
+        state = merge_state.load(self.__report_file_dict(valid_head), selective=selective, ro_property=ro_property,
+                                 verify_level=VerifyPolicy.level_of(verify_policy))
+        if state is None:
+            return False
+        main_report: Report = state['main_report']
+        saved_report: list[Report] = state['all_reports']
+        # main_report 可能已按完整解析后的用例数重新推选，与按头部推选的 main_report 比较
+        saved_head: Report = self.select_report_head(saved_report)[0]
+        if saved_head.report_path != main_head.report_path:
+            self.logger.info("Main Report of [%s] has been changed, rebuild merge state: %s -> %s",
+                             main_head.suite_name, saved_head.report_path, main_head.report_path)
+            return False
+        saved_path = set(map(lambda x: x.report_path, saved_report))
+        new_path = list(map(lambda x: x.report_path, filter(lambda x: x.report_path not in saved_path, valid_head)))
+        skip_modules = main_report.generate_passed_module_set() if selective else None
+        new_report = self.__load_report(new_path, cache=cache, jobs=jobs, executor=executor, skip_modules=skip_modules,
+                                        verify_policy=verify_policy, ro_property=ro_property)
+        # 保存的 Report 已驻留到保存的 InternTable，新增的 Report 沿用该表
+        intern_table: InternTable = state['intern_table']
+        for report in new_report:
+            report.intern_by(intern_table)
+        all_report = saved_report + new_report
+        # 新增的 Report 不一定最新，合入后按时间戳重排各矩阵的列
+        order = sorted(range(len(all_report)), key=lambda x: all_report[x].start_timestamp)
+        all_report = list(map(lambda x: all_report[x], order))
+        if self.elect_main(all_report, lambda x: x.module_total_case_num) is not main_report:
+            self.logger.info("Main Report of [%s] is re-elected by new Report(s), rebuild merge state.",
+                             main_head.suite_name)
+            return False
+        self.__main_report, self.__all_reports = main_report, all_report
+        self.__intern_table = intern_table
+        self.__assign_identify_name(all_report, main_report)
+        if len(new_report) == 0:
+            self.logger.info("Load merge state of [%s]: %s", main_head.suite_name, merge_state.state_path)
+            self.__case_matrix, self.__module_matrix = state['case_matrix'], state['module_matrix']
+            return True
+        self.logger.info("Fold %d new Report(s) into merge state of [%s]: %s",
+                         len(new_report), main_head.suite_name, merge_state.state_path)
+        self.__case_matrix = self.__fold_case_result_matrix(state['case_matrix'], saved_report, new_report, order,
+                                                            intern_table)
+        self.__module_matrix = self.__fold_module_done_matrix(state['module_matrix'], new_report, order)
+        self.__save_merge_state(merge_state, selective=selective, verify_policy=verify_policy,
+                                ro_property=ro_property)
+        return True
+
     def __verity(self):
         assert len(self.__all_reports) > 0
         if self.__case_num.is_failed():
@@ -130,60 +287,137 @@ class SuiteReport(Base):
     def search_main_summary(self, row_title: str):
         return self.__main_report.search_summary(row_title)
 
+    def __generate_case_result_matrix(self):
+        # 将所有 Report 的 case 拼接为 (module, case, report, result) 长表，再按 (module, case) 展开为 case × report 矩阵
+        table_list = list(map(lambda x: x.generate_case_result_table(), self.__all_reports))
+        report_codes = np.repeat(np.arange(len(table_list)), list(map(lambda x: x.shape[0], table_list)))
+        if report_codes.shape[0] == 0:
+            empty_names = np.array([], dtype=object)
+            return empty_names, empty_names, np.empty((0, len(table_list)), dtype=np.int8), \
+                np.empty((0, len(table_list)), dtype=np.int32)
+        key = self.__case_key(np.concatenate(list(map(lambda x: x['module_id'].to_numpy(), table_list))),
+                              np.concatenate(list(map(lambda x: x['case_id'].to_numpy(), table_list))))
+        # factorize 按首次出现的顺序编号，使输出顺序稳定
+        key_codes, key_uniques = pd.factorize(key)
+        # 矩阵中 -1 表示该 Report 中不存在此 case
+        result_matrix = np.full((key_uniques.shape[0], len(table_list)), -1, dtype=np.int8)
+        result_matrix[key_codes, report_codes] = np.concatenate(list(map(lambda x: x['result'].to_numpy(), table_list)))
+        # 仅为 has_failed 的 case 保存其在各 Report 的 CaseStore 中的行号，-1 表示不存在
+        has_failed_row = np.any(result_matrix == CaseResult.FAILED.result_id, axis=1)
+        failed_index = np.full(key_uniques.shape[0], -1, dtype=np.int64)
+        failed_index[has_failed_row] = np.arange(int(has_failed_row.sum()))
+        selected = failed_index[key_codes] >= 0
+        case_rows = np.concatenate(list(map(lambda x: np.arange(x.shape[0], dtype=np.int32), table_list)))
+        row_matrix = np.full((int(has_failed_row.sum()), len(table_list)), -1, dtype=np.int32)
+        row_matrix[failed_index[key_codes[selected]], report_codes[selected]] = case_rows[selected]
+        module_names = self.__intern_table.values_of(key_uniques >> self.__key_shift)
+        case_names = self.__intern_table.values_of(key_uniques & ((1 << self.__key_shift) - 1))
+        return module_names, case_names, result_matrix, row_matrix
+
+    @classmethod
+    def __case_key(cls, module_ids: np.ndarray, case_ids: np.ndarray):
+        return (module_ids.astype(np.int64) << cls.__key_shift) | case_ids.astype(np.int64)
+
+    @classmethod
+    def __fold_case_result_matrix(cls, case_matrix: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+                                  saved_report: list[Report], new_report: list[Report], order: list[int],
+                                  intern_table: InternTable):
+        module_names, case_names, result_matrix, row_matrix = case_matrix
+        failed_id = CaseResult.FAILED.result_id
+        saved_num = len(saved_report)
+        key_index = pd.Index(cls.__case_key(intern_table.intern_array(module_names),
+                                            intern_table.intern_array(case_names)))
+        # 将新增 Report 的 case 对应到已有的 (module, case)，未出现过的追加在末尾
+        new_column = []
+        for report in new_report:
+            table = report.generate_case_result_table()
+            new_key = pd.Index(cls.__case_key(table['module_id'].to_numpy(), table['case_id'].to_numpy()))
+            key_pos = key_index.get_indexer(new_key)
+            unseen = key_pos < 0
+            if unseen.any():
+                key_pos[unseen] = np.arange(len(key_index), len(key_index) + int(unseen.sum()))
+                key_index = key_index.append(new_key[unseen])
+            new_column.append((key_pos, table['result'].to_numpy()))
+        key_array = key_index.to_numpy()
+        module_names = intern_table.values_of(key_array >> cls.__key_shift)
+        case_names = intern_table.values_of(key_array & ((1 << cls.__key_shift) - 1))
+        folded_result = np.full((len(key_index), saved_num + len(new_report)), -1, dtype=np.int8)
+        folded_result[:result_matrix.shape[0], :saved_num] = result_matrix
+        for j, (key_pos, results) in enumerate(new_column, start=saved_num):
+            folded_result[key_pos, j] = results
+        # 合入只会增加结果，原有的 has_failed case 仍然 has_failed，沿用保存的行号
+        old_failed_key = np.flatnonzero(np.any(result_matrix == failed_id, axis=1))
+        failed_key = np.flatnonzero(np.any(folded_result == failed_id, axis=1))
+        is_old_failed = np.isin(failed_key, old_failed_key)
+        folded_row = np.full((failed_key.shape[0], folded_result.shape[1]), -1, dtype=np.int32)
+        folded_row[is_old_failed, :saved_num] = row_matrix
+        # 新出现的 has_failed case 在已保存的 Report 中查找行号
+        for i in np.flatnonzero(~is_old_failed):
+            key = failed_key[i]
+            for j in np.flatnonzero(folded_result[key, :saved_num] >= 0):
+                folded_row[i, j] = saved_report[j].find_case_by_module_case_name(module_names[key], case_names[key]).row
+        failed_index = np.full(len(key_index), -1, dtype=np.int64)
+        failed_index[failed_key] = np.arange(failed_key.shape[0])
+        for j, (key_pos, _) in enumerate(new_column, start=saved_num):
+            selected = failed_index[key_pos] >= 0
+            folded_row[failed_index[key_pos[selected]], j] = np.flatnonzero(selected)
+        return module_names, case_names, folded_result[:, order], folded_row[:, order]
+
     def __merge_update_cases(self):
-        module_name_set = set()
-        list(map(lambda x: module_name_set.update(x.module_name_list), self.__all_reports))
+        module_names, case_names, result_matrix, row_matrix = self.__case_matrix
         case_record_list = []
+        # 每个 Report 中有记录的 (CaseRecord, 行号)，用于导出 detail 子表
+        report_record_index: list[list[tuple[CaseRecord, int]]] = list(map(lambda x: [], self.__all_reports))
         case_num = CaseNum()
-        for module_name in module_name_set:
-            valuable_reports = []
-            case_result_map = None
-            for report in self.__all_reports:
-                module = report.find_module_by_name(module_name)
-                if module is None:
-                    continue
-                module: Module
-                valuable_reports.append(report)
-                cr_map = module.generate_case_result_map()
-                if cr_map is None:
-                    assert module.case_total_num == 0
-                    continue
-                cr_map.columns = ['case_name', report.identify_name]
-                if case_result_map is None:
-                    case_result_map = cr_map
-                else:
-                    case_result_map = pd.merge(case_result_map, cr_map, how='outer', on=case_result_map.columns[0])
-            if case_result_map is None:
-                continue
-            case_num.update_by_case_result_map(case_result_map)
-            has_failed_row = case_result_map.iloc[:, 1:].eq(CaseResult.FAILED.result_id).any(axis=1)
-            has_failed_map = case_result_map[has_failed_row]
-            if has_failed_map.shape[0] == 0:
-                continue
-            assert has_failed_map.shape[1] == len(valuable_reports) + 1
-            for i in range(has_failed_map.shape[0]):
-                case_name = has_failed_map.iloc[i, 0]
-                case_record = CaseRecord(case_name, module_name)
-                case_record.add_records_from_case_result_series(has_failed_map.iloc[i, :], valuable_reports)
-                case_record_list.append(case_record)
+        case_num.update_by_result_matrix(result_matrix)
+        has_failed_row = np.any(result_matrix == CaseResult.FAILED.result_id, axis=1)
+        for module_name, case_name, case_rows in zip(module_names[has_failed_row], case_names[has_failed_row],
+                                                     row_matrix.tolist()):
+            case_record = CaseRecord(case_name, module_name)
+            for r_i, row in case_record.add_records_from_case_rows(case_rows, self.__all_reports):
+                report_record_index[r_i].append((case_record, row))
+            case_record_list.append(case_record)
         assert sum(map(lambda x: int(x.still_failed()), case_record_list)) == case_num.of(CaseResult.FAILED)
-        return case_record_list, case_num
+        return case_record_list, report_record_index, case_num
+
+    def __generate_module_done_matrix(self):
+        # 所有 Report 的 module 共用同一套 id，完成状态保存为 module × report 的布尔矩阵
+        name_list = list(map(lambda x: x.module_name_list, self.__all_reports))
+        report_codes = np.repeat(np.arange(len(name_list)), list(map(len, name_list)))
+        module_codes, module_names = pd.factorize(np.concatenate(name_list + [np.array([], dtype=object)]))
+        module_done_matrix = np.zeros((module_names.shape[0], len(name_list)), dtype=bool)
+        module_done_matrix[module_codes, report_codes] = np.concatenate(
+            list(map(lambda x: x.generate_module_done_array(), self.__all_reports)) + [np.array([], dtype=bool)])
+        return np.asarray(module_names, dtype=object), module_done_matrix
+
+    @staticmethod
+    def __fold_module_done_matrix(module_matrix: tuple[np.ndarray, np.ndarray], new_report: list[Report],
+                                  order: list[int]):
+        module_names, module_done_matrix = module_matrix
+        saved_num = module_done_matrix.shape[1]
+        module_index = pd.Index(module_names, dtype=object)
+        new_column = []
+        for report in new_report:
+            new_name = pd.Index(report.module_name_list, dtype=object)
+            module_pos = module_index.get_indexer(new_name)
+            unseen = module_pos < 0
+            if unseen.any():
+                module_pos[unseen] = np.arange(len(module_index), len(module_index) + int(unseen.sum()))
+                module_index = module_index.append(new_name[unseen])
+            new_column.append((module_pos, report.generate_module_done_array()))
+        folded_done = np.zeros((len(module_index), saved_num + len(new_report)), dtype=bool)
+        folded_done[:module_done_matrix.shape[0], :saved_num] = module_done_matrix
+        for j, (module_pos, done) in enumerate(new_column, start=saved_num):
+            folded_done[module_pos, j] = done
+        return np.asarray(module_index, dtype=object), folded_done[:, order]
 
     def __merge_update_modules(self):
         module_num = ModuleNum()
-        module_done_map = None
-        for r_i, report in enumerate(self.__all_reports):
-            md_map = report.generate_module_done_map()
-            md_map.columns = ['module_name', str(r_i)]
-            if module_done_map is None:
-                module_done_map = md_map
-            else:
-                module_done_map = pd.merge(module_done_map, md_map, how='outer', on=module_done_map.columns[0])
-        incomplete_modules = module_done_map[~module_done_map.iloc[:, 1:].any(axis=1)]
-        module_num.update(total=module_done_map.shape[0], incomplete=incomplete_modules.shape[0])
-        assert incomplete_modules.shape[1] == len(self.__all_reports) + 1
-        incomplete_table = pd.DataFrame(incomplete_modules.iloc[:, 0]).reset_index(drop=True)
-        incomplete_table.columns = ['Incomplete Modules']
+        module_names, module_done_matrix = self.__module_matrix
+        # 任一 Report 中完成即视为完成
+        incomplete_row = ~module_done_matrix.any(axis=1)
+        module_num.update(total=module_names.shape[0], incomplete=int(incomplete_row.sum()))
+        incomplete_table = pd.DataFrame({'Incomplete Modules': module_names[incomplete_row]})
         return incomplete_table, module_num
 
     def __inspect_summary(self):
@@ -220,14 +454,15 @@ class SuiteReport(Base):
         has_failed_record = pd.concat(module_record_list).reset_index(drop=True)
         return has_failed_record
 
-    def __create_has_failed_detail_table(self, ref_report: Report):
+    def __create_has_failed_detail_table(self, report_index: int):
         case_detail_dict: dict[str, list[pd.DataFrame]] = dict()
         # 导出 case detail 并按 module_name 分组
-        for case_record in self.__has_failed_record:
-            case_detail = case_record.get_case_detail_of_report(ref_report)
-            # 跳过没有记录的 CaseRecord
-            if case_detail is None:
-                continue
+        record_list = self.__report_record_index[report_index]
+        # 批量读取该 Report 中所需的 failure details
+        case_store = self.__all_reports[report_index].case_store
+        details_dict = case_store.details_of_rows(list(map(lambda x: x[1], record_list)))
+        for case_record, row in record_list:
+            case_detail = Case(case_store, row).get_case_detail_table(details_dict)
             module_name = case_record.from_module
             if module_name in case_detail_dict.keys():
                 case_detail_dict[module_name].append(case_detail)
@@ -287,7 +522,7 @@ class SuiteReport(Base):
         concat_list.append(main_summary)
         concat_list.append(blank)
         # 主报告中 has_failed_case 的 detail 子表（如果在主报告中有记录的话），没有则缺省
-        has_failed_detail = self.__create_has_failed_detail_table(self.__main_report)
+        has_failed_detail = self.__create_has_failed_detail_table(self.__all_reports.index(self.__main_report))
         if has_failed_detail is not None:
             concat_list.append(bold_title("Detail of CaseHasFailed in Report-[%s]" % self.__main_report.identify_name))
             concat_list.append(wbP.b_header(has_failed_detail))
@@ -311,7 +546,7 @@ class SuiteReport(Base):
             concat_list.append(summary)
             concat_list.append(blank)
             # 补充报告中 has_failed_case 的 detail 子表（如果有记录的话），没有则缺省
-            has_failed_detail = self.__create_has_failed_detail_table(report)
+            has_failed_detail = self.__create_has_failed_detail_table(i)
             if has_failed_detail is not None:
                 concat_list.append(bold_title("Detail of CaseHasFailed in Report-[%s]" % report.identify_name))
                 concat_list.append(wbP.b_header(has_failed_detail))
@@ -328,38 +563,36 @@ class SuiteReport(Base):
             device_info = wbP.highlight_map_table(device_info, 'ro.build.version.security_patch', wbP.Style.WRONG)
         return device_info
 
-    def get_top_table(self):
+    @staticmethod
+    def create_top_table(main_report: ReportHead):
         top_dict = {
             'Version:': 'V1.3 by GRMv2.1',
-            'Android OS Version:': self.__main_report.search_summary('Release (SDK)'),
+            'Android OS Version:': main_report.search_summary('Release (SDK)'),
             'Software Version:': '/',
-            'Security Patch:': self.__main_report.search_summary('Security Patch'),
-            'ABIs:': self.__main_report.search_summary('ABIs'),
-            'Fingerprint:': self.__main_report.search_summary('Fingerprint'),
+            'Security Patch:': main_report.search_summary('Security Patch'),
+            'ABIs:': main_report.search_summary('ABIs'),
+            'Fingerprint:': main_report.search_summary('Fingerprint'),
         }
         top_table = utils.dict2map(top_dict)
         return top_table
 
-    def get_abstract_table(self):
-        build_list = []
-        note_list = []
-        row_title = 'Suite / Build'
-        for i, diffs in enumerate(self.__summary_diff):
-            if row_title in diffs:
-                report = self.__all_reports[i]
-                build_list.append(report.search_summary(row_title))
-                note_list.append(report.get_module_case_note())
-        if self.__case_num.is_failed():
+    def get_top_table(self):
+        return self.create_top_table(self.__main_report)
+
+    @staticmethod
+    def create_abstract_table(main_report: ReportHead, case_num: CaseNum, module_num: ModuleNum,
+                              build_list: list[str], note_list: list[str]):
+        if case_num.is_failed():
             result = wbP.add_tag('Fail', wbP.Style.RED)
-        elif self.__module_num.is_incomplete():
+        elif module_num.is_incomplete():
             result = wbP.add_tag('Incomplete', wbP.Style.YELLOW)
         else:
             result = wbP.add_tag('Pass', wbP.Style.GREEN)
         abstract_dict = {
-            'Suite': self.__main_report.suite_name,
-            'Suite / Build': self.__main_report.search_summary('Suite / Build'),
-            'Pass': self.__case_num.of(CaseResult.PASSED),
-            'Fail': self.__case_num.of(CaseResult.FAILED),
+            'Suite': main_report.suite_name,
+            'Suite / Build': main_report.search_summary('Suite / Build'),
+            'Pass': case_num.of(CaseResult.PASSED),
+            'Fail': case_num.of(CaseResult.FAILED),
             'Daily Build/Num': '\n'.join(build_list),
             'Result': result,
             'Note': wbP.add_tag('\n'.join(note_list), wbP.Style.WW),
@@ -367,6 +600,18 @@ class SuiteReport(Base):
         abstract_table = pd.DataFrame([list(abstract_dict.values())], columns=list(abstract_dict.keys()))
         return abstract_table
 
+    def get_abstract_table(self):
+        build_list = []
+        note_list = []
+        row_title = 'Suite / Build'
+        for i, diffs in enumerate(self.__summary_diff):
+            if row_title in diffs:
+                report = self.__all_reports[i]
+                build_list.append(report.search_summary(row_title))
+                note_list.append(report.get_module_case_note())
+        return self.create_abstract_table(self.__main_report, self.__case_num, self.__module_num,
+                                          build_list, note_list)
+
     @staticmethod
     def get_empty_abstract_table(suite_name: str):
         abstract_dict = {
@@ -385,31 +630,54 @@ class SuiteReport(Base):
 
 class CaseRecord:
     class Record:
-        def __init__(self, report: Report, case: Case):
-            self.report = report
-            self.case = case
+        # 仅保存 case 在 Report 的 CaseStore 中的行号，使用时再创建 Case
+        __slots__ = ('__report', '__row')
+
+        def __init__(self, report: Report, row: int):
+            object.__setattr__(self, '_Record__report', report)
+            object.__setattr__(self, '_Record__row', row)
+
+        def __setattr__(self, key, value):
+            raise AttributeError("Record is immutable, can not set attribute: %s" % key)
+
+        def __delattr__(self, key):
+            raise AttributeError("Record is immutable, can not delete attribute: %s" % key)
+
+        def __reduce__(self):
+            return self.__class__, (self.__report, self.__row)
+
+        @property
+        def report(self):
+            return self.__report
+
+        @property
+        def row(self):
+            return self.__row
+
+        @property
+        def case(self):
+            return Case(self.__report.case_store, self.__row)
+
+    __slots__ = ('__case_name', '__module_name', '__records')
 
     def __init__(self, case_name: str, module_name: str):
         self.__case_name = case_name
         self.__module_name = module_name
         self.__records: list[CaseRecord.Record] = []
 
-    def add_records(self, report: Report):
-        case = report.find_case_by_module_case_name(self.__module_name, self.__case_name)
-        if case is None:
-            raise ValueError("Case(module_name = \"%s\", case_name = \"%s\") can not be found in Report: %s."
-                             % (self.__module_name, self.__case_name, report.report_path))
-        self.__records.append(self.Record(report, case))
-
-    def add_records_from_case_result_series(self, case_result_series: pd.Series, ref_reports: list[Report]):
-        if case_result_series.shape[0] != len(ref_reports) + 1:
-            raise ValueError("Length of case_result_series should equal to num of ref_reports.")
-        if case_result_series.iloc[0] != self.__case_name:
-            raise ValueError("Invalid case_result_series: Wrong case_name.")
-        for i in range(1, case_result_series.shape[0]):
-            if pd.isna(case_result_series.iloc[i]):
+    def add_records_from_case_rows(self, case_rows: list[int], ref_reports: list[Report]):
+        if len(case_rows) != len(ref_reports):
+            raise ValueError("Length of case_rows should equal to num of ref_reports.")
+        added = []
+        for r_i, row in enumerate(case_rows):
+            # 跳过不包含该 case 的 Report
+            if row < 0:
                 continue
-            self.add_records(ref_reports[i - 1])
+            if ref_reports[r_i].case_store.name_of(row) != self.__case_name:
+                raise ValueError("Invalid case_rows: Wrong case_name in Report: %s." % ref_reports[r_i].report_path)
+            self.__records.append(self.Record(ref_reports[r_i], row))
+            added.append((r_i, row))
+        return added
 
     @property
     def from_case(self):
@@ -442,13 +710,6 @@ class CaseRecord:
                                      columns=['TestName', 'FinalResultOrFail', 'RecordDetails'])
         return record_detail
 
-    def get_case_detail_of_report(self, ref_report: Report):
-        for record in self.__records:
-            report, case = record.report, record.case
-            if report is ref_report:
-                return case.get_case_detail_table()
-        return None
-
 
 class NoReportException(ValueError):
     def __init__(self):
@@ -0,0 +1,109 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+import pandas as pd
+import numpy as np
+from .Base import Base
+from .Report import ReportHead, ReportCounter
+from .SuiteReport import SuiteReport, NoReportException
+from . import utils
+from .ModuleCase import CaseNum, ModuleNum, CaseResult
+
+
+# 仅统计数量的 SuiteReport：不创建 Case 与 CaseRecord，只用于生成 SUM 页
+class SuiteSummary(Base):
+    def __init__(self, suite_dir: str, flag_unpack=False, jobs: int = 1, executor: Executor = None,
+                 report_head_list: list[ReportHead] = None):
+        self.wrong_spl = False
+        self.inconsistent_summary: list[str] = []
+        super().__init__()
+        self.__suite_path = utils.absolute_path(suite_dir)
+        if report_head_list is None:
+            report_head_list = SuiteReport.valid_report_head(self.__suite_path, flag_unpack=flag_unpack)
+        if len(report_head_list) == 0:
+            raise NoReportException
+        main_head, valid_head = SuiteReport.select_report_head(report_head_list)
+        self.__case_num = CaseNum()
+        self.__module_num = ModuleNum()
+        if len(valid_head) == 1:
+            # 只有一个 Report 时无需合并，直接使用头部 Summary 的数量
+            self.__main_report, self.__all_reports = main_head, valid_head
+            self.__count_by_summary()
+        else:
+            self.__main_report, self.__all_reports = self.__count_suite_report(valid_head, jobs=jobs,
+                                                                               executor=executor)
+            self.__merge_count()
+
+    def __count_by_summary(self):
+        summary = self.__main_report.summary
+        passed_num, failed_num = int(summary['Tests Passed']), int(summary['Tests Failed'])
+        self.__case_num.total += passed_num + failed_num
+        self.__case_num.add_of(CaseResult.PASSED, passed_num)
+        self.__case_num.add_of(CaseResult.FAILED, failed_num)
+        self.__case_num.verify()
+        self.__module_num.update(total=int(summary['Modules Total']), done=int(summary['Modules Done']))
+
+    @staticmethod
+    def __count_suite_report(head_list: list[ReportHead], jobs: int = 1, executor: Executor = None):
+        path_list = list(map(lambda x: x.report_path, head_list))
+        if executor is not None:
+            counted_report = list(executor.map(ReportCounter, path_list))
+        elif jobs > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(path_list))) as executor:
+                counted_report = list(executor.map(ReportCounter, path_list))
+        else:
+            counted_report = list(map(ReportCounter, path_list))
+        # 与 SuiteReport 一致，按完整统计后的用例数复核 main_report
+        main_report = SuiteReport.elect_main(counted_report, lambda x: x.module_total_case_num)
+        return main_report, counted_report
+
+    def __merge_count(self):
+        report_list: list[ReportCounter] = self.__all_reports
+        report_codes = np.arange(len(report_list))
+        # 所有 Report 的 module 共用同一套 id
+        module_count = list(map(lambda x: len(x.module_name_list), report_list))
+        module_codes, module_names = pd.factorize(
+            np.concatenate(list(map(lambda x: np.array(x.module_name_list, dtype=object), report_list))))
+        module_done_matrix = np.zeros((module_names.shape[0], len(report_list)), dtype=bool)
+        module_done_matrix[module_codes, np.repeat(report_codes, module_count)] = \
+            np.concatenate(list(map(lambda x: x.generate_module_done_array(), report_list)))
+        self.__module_num.update(total=module_names.shape[0], incomplete=int((~module_done_matrix.any(axis=1)).sum()))
+        # 以 (module id, case 名称 id) 作为 case 的 key，展开为 case × report 的结果矩阵
+        module_offset = np.concatenate([[0], np.cumsum(module_count)[:-1]])
+        case_module = np.concatenate(list(map(lambda x: module_codes[module_offset[x] + report_list[x].case_module],
+                                              report_codes)))
+        name_codes, name_uniques = pd.factorize(
+            np.concatenate(list(map(lambda x: np.array(x.case_names, dtype=object), report_list))))
+        key_codes, key_uniques = pd.factorize(case_module.astype(np.int64) * name_uniques.shape[0] + name_codes)
+        result_matrix = np.full((key_uniques.shape[0], len(report_list)), -1, dtype=np.int8)
+        result_matrix[key_codes, np.repeat(report_codes, list(map(lambda x: x.module_total_case_num, report_list)))] = \
+            np.concatenate(list(map(lambda x: x.case_results, report_list)))
+        self.__case_num.update_by_result_matrix(result_matrix)
+
+    @property
+    def suite_name(self):
+        return self.__main_report.suite_name
+
+    @property
+    def suite_dir(self):
+        return utils.path_basename(self.__suite_path)
+
+    @property
+    def main_summary_spl(self):
+        return self.search_main_summary('Security Patch')
+
+    def search_main_summary(self, row_title: str):
+        return self.__main_report.search_summary(row_title)
+
+    def get_top_table(self):
+        return SuiteReport.create_top_table(self.__main_report)
+
+    def get_abstract_table(self):
+        build_list = []
+        note_list = []
+        row_title = 'Suite / Build'
+        main_value = self.__main_report.search_summary(row_title)
+        for report in self.__all_reports:
+            if report.search_summary(row_title) != main_value:
+                build_list.append(report.search_summary(row_title))
+                note_list.append(report.get_module_case_note())
+        return SuiteReport.create_abstract_table(self.__main_report, self.__case_num, self.__module_num,
+                                                 build_list, note_list)
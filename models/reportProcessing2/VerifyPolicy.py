@@ -0,0 +1,123 @@
+import os
+import random
+import argparse
+from enum import Enum
+from .Base import Base
+from .ReportCache import ReportCache, CACHE_DIR
+from . import utils
+
+
+class VerifyLevel(Enum):
+    # full: 完整核对；sampled: 随机抽取部分 module 与 html 核对；trusted: 不核对
+    FULL = 'full'
+    SAMPLED = 'sampled'
+    TRUSTED = 'trusted'
+
+    @classmethod
+    def of_value(cls, value: str):
+        for level in cls:
+            if level.value == value:
+                return level
+        raise ValueError("Unexpected verify level: %s, expected: %s." % (value, list(map(lambda x: x.value, cls))))
+
+
+class VerifyPolicy(Base):
+    __suffix = '.verified'
+    # 已按某一级别核对过的 Report 可跳过的级别
+    __covered_level = {
+        VerifyLevel.FULL: {VerifyLevel.FULL, VerifyLevel.SAMPLED},
+        VerifyLevel.SAMPLED: {VerifyLevel.SAMPLED},
+    }
+
+    def __init__(self, level: VerifyLevel = VerifyLevel.FULL, sample_num: int = 10, record_dir: str | None = CACHE_DIR):
+        super().__init__()
+        if sample_num <= 0:
+            raise ValueError("The sample_num of VerifyPolicy should be positive, but given: %s" % sample_num)
+        self.__level = level
+        self.__sample_num = sample_num
+        # record_dir 为 None 时不记录核对结果
+        self.__record_dir = None
+        if record_dir is not None:
+            self.__record_dir = utils.absolute_path(record_dir)
+            if not os.path.exists(self.__record_dir):
+                os.makedirs(self.__record_dir, exist_ok=True)
+
+    @property
+    def level(self):
+        return self.__level
+
+    @property
+    def sample_num(self):
+        return self.__sample_num
+
+    @staticmethod
+    def level_of(verify_policy: 'VerifyPolicy | None'):
+        # 未提供 verify_policy 时完整核对
+        return VerifyLevel.FULL if verify_policy is None else verify_policy.level
+
+    @classmethod
+    def is_covered(cls, level: VerifyLevel, verified_level: VerifyLevel | None):
+        # 已按 verified_level 核对过的 Report 是否满足 level 的要求
+        return level is VerifyLevel.TRUSTED or level in cls.__covered_level.get(verified_level, set())
+
+    @property
+    def recording(self):
+        # 是否需要 Report 的内容哈希以查找和记录核对结果
+        return self.__level is not VerifyLevel.TRUSTED and self.__record_dir is not None
+
+    @staticmethod
+    def add_arguments(parser: argparse.ArgumentParser, default_level: VerifyLevel = VerifyLevel.FULL):
+        parser.add_argument('--verify', type=str, choices=list(map(lambda x: x.value, VerifyLevel)),
+                            default=default_level.value,
+                            help="Verify level of Report(s): full, sampled (only verify some random modules against "
+                                 "the html) or trusted (skip verifying).")
+        parser.add_argument('--verify-sample', type=int, default=10,
+                            help="Num of modules to verify against the html when the verify level is sampled.")
+        parser.add_argument('--no-verify-record', action='store_true',
+                            help="Select to verify every Report again instead of skipping the verified ones or not.")
+
+    @classmethod
+    def from_arguments(cls, args: argparse.Namespace):
+        return cls(VerifyLevel.of_value(args.verify), sample_num=args.verify_sample,
+                   record_dir=None if args.no_verify_record else CACHE_DIR)
+
+    def __record_path(self, digest: str):
+        return os.path.join(self.__record_dir, digest + self.__suffix)
+
+    def __recorded_level(self, digest: str):
+        record_path = self.__record_path(digest)
+        if not os.path.exists(record_path):
+            return None
+        with open(record_path, 'r', encoding='UTF-8') as f:
+            try:
+                return VerifyLevel.of_value(f.read().strip())
+            except ValueError:
+                return None
+
+    def resolve(self, file_list: list[str], file_digests: list[bytes | None] = None):
+        # 返回本次实际使用的级别及 Report 的内容哈希（不记录时为 None），已核对过的 Report 按 trusted 处理
+        # file_digests: 已读取的各文件哈希（ReportCache.file_digests），提供时不再读取文件
+        if not self.recording:
+            return self.__level, None
+        digest = ReportCache.content_hash(file_list, with_path=False, file_digests=file_digests)
+        recorded_level = self.__recorded_level(digest)
+        if recorded_level is not None and self.is_covered(self.__level, recorded_level):
+            self.logger.info("Skip verifying Report which has been verified at %s level: %s",
+                             recorded_level.value, os.path.dirname(file_list[0]))
+            return VerifyLevel.TRUSTED, digest
+        return self.__level, digest
+
+    def record(self, digest: str, level: VerifyLevel):
+        if self.__record_dir is None or level is VerifyLevel.TRUSTED:
+            return
+        recorded_level = self.__recorded_level(digest)
+        if recorded_level is not None and self.is_covered(level, recorded_level):
+            return
+        record_path = self.__record_path(digest)
+        temp = '%s.%d.tmp' % (record_path, os.getpid())
+        with open(temp, 'w', encoding='UTF-8') as f:
+            f.write(level.value)
+        os.replace(temp, record_path)
+
+    def sample_modules(self, module_name_list: list[str]):
+        return set(random.sample(module_name_list, min(self.__sample_num, len(module_name_list))))
@@ -2,9 +2,13 @@ import pandas as pd
 from openpyxl import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
 import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from .Base import Base
-from .Report import Report
-from .SuiteReport import SuiteReport, NoReportException
+from .Report import Report, ReportHead
+from .ReportCache import ReportCache
+from .SuiteReport import SuiteReport
+from .SuiteSummary import SuiteSummary
+from .VerifyPolicy import VerifyPolicy
 from . import utils
 from . import workbookProcess as wbP
 
@@ -20,28 +24,66 @@ class XTSReport(Base):
         'VTS',
     ]
 
-    def __init__(self, xts_dir: str, flag_unpack=False):
+    def __init__(self, xts_dir: str, flag_unpack=False, cache: ReportCache = None, jobs: int = 1, incremental=False,
+                 selective=False, quick=False, compress_details=False, verify_policy: VerifyPolicy = None,
+                 ro_property: list[str] = None):
         super().__init__()
         self.__xts_path = utils.absolute_path(xts_dir)
+        # device info 中保留的属性，未提供时使用 Report 的默认目标属性
+        self.__ro_property = Report.default_ro_property() if ro_property is None else list(ro_property)
+        # quick 模式下仅统计数量，只生成 SUM 页
+        self.__quick = quick
         dir_path_list = utils.dirs_sort_by_create(self.__xts_path, reverse=True)
-        self.__xts_report = self.__load_xts_report(dir_path_list, flag_unpack=flag_unpack)
+        self.__xts_report = self.__load_xts_report(dir_path_list, flag_unpack=flag_unpack, cache=cache, jobs=jobs,
+                                                   incremental=incremental, selective=selective, quick=quick,
+                                                   compress_details=compress_details, verify_policy=verify_policy,
+                                                   ro_property=self.__ro_property)
         if len(self.__xts_report) == 0:
             raise ValueError("No valid SuiteReport in XTSReport.")
         self.__verify()
         self.__inspect_spl()
         self.__inspect_suite_summary()
 
-    @staticmethod
-    def __load_xts_report(path_list: list[str], flag_unpack=False):
-        xts_report = dict()
+    @classmethod
+    def __probe_xts_report(cls, path_list: list[str], flag_unpack=False):
+        # 预扫描：按报告头部确定各文件夹的套件，同一套件只保留排序在前的文件夹
+        suite_head: dict[str, tuple[str, list[ReportHead]]] = dict()
         for path in path_list:
-            try:
-                suite_report = SuiteReport(path, flag_unpack=flag_unpack)
-            except NoReportException:
+            head_list = SuiteReport.valid_report_head(path, flag_unpack=flag_unpack)
+            if len(head_list) == 0:
                 continue
-            suite_name = suite_report.suite_name
-            if suite_name not in xts_report.keys():
-                xts_report[suite_name] = suite_report
+            suite_name = SuiteReport.elect_suite_name(head_list)
+            if suite_name in suite_head.keys():
+                cls.logger.info("Skip SuiteReport of [%s] in: %s\n\tAlready kept: %s",
+                                suite_name, path, suite_head[suite_name][0])
+                continue
+            suite_head[suite_name] = (path, head_list)
+        return suite_head
+
+    @classmethod
+    def __load_xts_report(cls, path_list: list[str], flag_unpack=False, cache: ReportCache = None, jobs: int = 1,
+                          incremental=False, selective=False, quick=False, compress_details=False,
+                          verify_policy: VerifyPolicy = None, ro_property: list[str] = None):
+        suite_head = cls.__probe_xts_report(path_list, flag_unpack=flag_unpack)
+
+        def load_suite_report(_path: str, _head_list: list[ReportHead], _executor: Executor = None):
+            if quick:
+                return SuiteSummary(_path, flag_unpack=flag_unpack, jobs=jobs, executor=_executor,
+                                    report_head_list=_head_list)
+            return SuiteReport(_path, flag_unpack=flag_unpack, cache=cache, jobs=jobs, executor=_executor,
+                               report_head_list=_head_list, incremental=incremental, selective=selective,
+                               compress_details=compress_details, verify_policy=verify_policy,
+                               ro_property=ro_property)
+
+        if jobs > 1 and len(suite_head) > 1:
+            # 各套件相互独立：以线程并发构建 SuiteReport，共用同一个进程池解析 Report，线程数同样不超过 jobs
+            with ProcessPoolExecutor(max_workers=jobs) as process_pool, \
+                    ThreadPoolExecutor(max_workers=min(jobs, len(suite_head))) as thread_pool:
+                suite_report_list = list(thread_pool.map(lambda x: load_suite_report(*x, process_pool),
+                                                         suite_head.values()))
+        else:
+            suite_report_list = list(map(lambda x: load_suite_report(*x), suite_head.values()))
+        xts_report = dict(zip(suite_head.keys(), suite_report_list))
         sorted_xts = dict(sorted(xts_report.items(), key=lambda x: x[0], reverse=False))
         return sorted_xts
 
@@ -96,7 +138,7 @@ class XTSReport(Base):
         on_column = sheet.columns[0]
         for di in device_info_list[1:]:
             sheet = pd.merge(sheet, di, how='outer', on=on_column)
-        sheet = Report.filter_property(sheet, on=on_column)
+        sheet = Report.filter_property(sheet, on=on_column, ro_property=self.__ro_property)
         device_info_sheet = wbP.b_header(sheet)
         return device_info_sheet
 
@@ -136,6 +178,8 @@ class XTSReport(Base):
                                      'G': 100,
                                  })
         wb.worksheets[0] = ws_sum
+        if self.__quick:
+            return wb
         device_info_sheet = self.__create_device_info_sheet()
         if device_info_sheet is not None:
             ws_di: Worksheet = wb.create_sheet('device info')
@@ -1,4 +1,7 @@
-from .Report import Report
+from .Report import Report, ReportHead
+from .ReportCache import ReportCache
 from .ReportFinder import ReportFinder
 from .SuiteReport import SuiteReport
+from .SuiteSummary import SuiteSummary
+from .VerifyPolicy import VerifyPolicy, VerifyLevel
 from .XTSReport import XTSReport
@@ -2,6 +2,7 @@ from .pathUtils import absolute_path, split_end, path_basename
 from .pathUtils import SafePath, CheckPath
 from .pandasUtils import dict2map, reset_column, locate_map_table
 from .packageUtils import extract, pack, is_package
+from . import vfsUtils as vfs
 
 dirs_sort_by_create = pathUtils.LSPath.dirs_sort_by_create
 files_sort_by_create = pathUtils.LSPath.files_sort_by_create
@@ -30,12 +30,14 @@ def is_package(pkg_path: str):
     return False
 
 
-def pack(from_dir: str, to_file: str):
+def pack(from_dir: str, to_file: str, root_name: str = None):
+    # root_name: 包内根文件夹的名称，未提供时与 from_dir 的名称相同
     CheckPath.assert_not_existed(to_file)
     with zipfile.ZipFile(to_file, 'w') as zip_f:
-        root_out_pkg = pathUtils.split_end(from_dir)[0]
+        if root_name is None:
+            root_name = pathUtils.path_basename(from_dir)
         for root, dirs, files in os.walk(from_dir):
-            CheckPath.assert_start_with(root, root_out_pkg)
-            root_in_pkg = root[len(root_out_pkg):]
+            CheckPath.assert_start_with(root, from_dir)
+            root_in_pkg = os.path.join(root_name, root[len(from_dir):].lstrip(os.sep))
             for file in files:
                 zip_f.write(os.path.join(root, file), os.path.join(root_in_pkg, file))
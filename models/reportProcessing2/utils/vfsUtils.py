@@ -0,0 +1,191 @@
+import os
+import io
+import shutil
+import zipfile
+import functools
+import rarfile
+
+# 虚拟路径：压缩包路径与包内路径以 SEPARATOR 连接，例如 E:\Reports\CTS.zip::2024.08.13_13.16.47/test_result.xml
+SEPARATOR = '::'
+# zip 与 rar 的文件头
+_PACKAGE_MAGIC = (b'PK\x03\x04', b'Rar!\x1a\x07')
+
+
+def is_virtual(path: str):
+    return SEPARATOR in path
+
+
+def split_archive(path: str):
+    # 返回 (压缩包路径, 包内路径)，非虚拟路径的压缩包路径为 None；包内路径统一使用 '/' 且不以 '/' 开头或结尾
+    if not is_virtual(path):
+        return None, path
+    archive_path, member = path.split(SEPARATOR, 1)
+    return archive_path, member.replace('\\', '/').strip('/')
+
+
+def join_archive(archive_path: str, member: str = ''):
+    return archive_path + SEPARATOR + member.replace('\\', '/').strip('/')
+
+
+def join(path: str, name: str):
+    if not is_virtual(path):
+        return os.path.join(path, name)
+    archive_path, member = split_archive(path)
+    return join_archive(archive_path, '/'.join(filter(lambda x: x != '', [member, name])))
+
+
+def _open_archive(archive_path: str):
+    if zipfile.is_zipfile(archive_path):
+        return zipfile.ZipFile(archive_path, 'r')
+    elif rarfile.is_rarfile(archive_path):
+        return rarfile.RarFile(archive_path, 'r')
+    raise ValueError("%s is not supported to be read as archive." % archive_path)
+
+
+@functools.lru_cache(maxsize=32)
+def _archive_index(archive_path: str, size: int, mtime_ns: int):
+    # 包内文件到 (大小, CRC) 的映射及所有目录（含未单独记录的上级目录），按压缩包的大小与修改时间缓存
+    files: dict[str, tuple[int, int]] = dict()
+    dirs: set[str] = {''}
+    with _open_archive(archive_path) as archive:
+        for info in archive.infolist():
+            name = info.filename.replace('\\', '/').strip('/')
+            if name == '':
+                continue
+            if info.is_dir():
+                dirs.add(name)
+            else:
+                files[name] = (info.file_size, info.CRC)
+            parent = name.rsplit('/', 1)[0] if '/' in name else ''
+            while parent not in dirs:
+                dirs.add(parent)
+                parent = parent.rsplit('/', 1)[0] if '/' in parent else ''
+    return files, dirs
+
+
+def archive_index(archive_path: str):
+    stat = os.stat(archive_path)
+    return _archive_index(archive_path, stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=32)
+def _archive_packages(archive_path: str, size: int, mtime_ns: int):
+    # 包内所有压缩包文件（按文件头判定），只打开一次压缩包读取各文件的文件头，与索引一同按大小与修改时间缓存
+    packages: set[str] = set()
+    with _open_archive(archive_path) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            with archive.open(info, 'r') as f:
+                if f.read(8).startswith(_PACKAGE_MAGIC):
+                    packages.add(info.filename.replace('\\', '/').strip('/'))
+    return packages
+
+
+def exists(path: str):
+    return isfile(path) or isdir(path)
+
+
+def isfile(path: str):
+    archive_path, member = split_archive(path)
+    if archive_path is None:
+        return os.path.isfile(path)
+    if not os.path.isfile(archive_path):
+        return False
+    return member in archive_index(archive_path)[0].keys()
+
+
+def isdir(path: str):
+    archive_path, member = split_archive(path)
+    if archive_path is None:
+        return os.path.isdir(path)
+    if not os.path.isfile(archive_path):
+        return False
+    return member in archive_index(archive_path)[1]
+
+
+def walk(path: str):
+    # 与 os.walk 相同，按 (root, dirs, files) 自上而下遍历；虚拟路径在压缩包的目录索引中遍历
+    archive_path, member = split_archive(path)
+    if archive_path is None:
+        yield from os.walk(path)
+        return
+    files, dirs = archive_index(archive_path)
+    prefix = member + '/' if member != '' else ''
+    child_dirs: dict[str, list[str]] = dict()
+    child_files: dict[str, list[str]] = dict()
+    for name in filter(lambda x: x.startswith(prefix) and x != member, dirs):
+        parent, base = name.rsplit('/', 1) if '/' in name else ('', name)
+        child_dirs.setdefault(parent, []).append(base)
+    for name in filter(lambda x: x.startswith(prefix), files.keys()):
+        parent, base = name.rsplit('/', 1) if '/' in name else ('', name)
+        child_files.setdefault(parent, []).append(base)
+    stack = [member]
+    while len(stack) != 0:
+        current = stack.pop()
+        sub_dirs = sorted(child_dirs.get(current, []))
+        yield join_archive(archive_path, current), sub_dirs, sorted(child_files.get(current, []))
+        stack += list(map(lambda x: '/'.join(filter(lambda y: y != '', [current, x])), reversed(sub_dirs)))
+
+
+def basename(path: str):
+    # 虚拟路径为包内路径的最后一级，压缩包的根目录为压缩包的文件名（不含扩展名）
+    archive_path, member = split_archive(path)
+    if archive_path is None:
+        return os.path.basename(os.path.normpath(path))
+    if member == '':
+        return os.path.splitext(os.path.basename(archive_path))[0]
+    return member.rsplit('/', 1)[-1]
+
+
+def open_binary(path: str):
+    archive_path, member = split_archive(path)
+    if archive_path is None:
+        return open(path, 'rb')
+    # 关闭压缩包后已打开的包内文件仍然可读，关闭该文件时释放压缩包
+    with _open_archive(archive_path) as archive:
+        return archive.open(member, 'r')
+
+
+def is_package(path: str):
+    # 包内文件按文件头判定，不解压
+    archive_path, member = split_archive(path)
+    if archive_path is None:
+        return zipfile.is_zipfile(path) or rarfile.is_rarfile(path)
+    stat = os.stat(archive_path)
+    return member in _archive_packages(archive_path, stat.st_size, stat.st_mtime_ns)
+
+
+def open_text(path: str, encoding: str = 'UTF-8'):
+    if not is_virtual(path):
+        return open(path, 'r', encoding=encoding)
+    return io.TextIOWrapper(open_binary(path), encoding=encoding)
+
+
+def file_identity(path: str):
+    # 虚拟路径以包内文件的大小、CRC 及压缩包的修改时间作为文件属性
+    archive_path, member = split_archive(path)
+    if archive_path is None:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+    size, crc = archive_index(archive_path)[0][member]
+    return size, (os.stat(archive_path).st_mtime_ns, crc)
+
+
+def extract_file(path: str, to_file: str):
+    with open_binary(path) as from_f, open(to_file, 'wb') as to_f:
+        shutil.copyfileobj(from_f, to_f)
+
+
+def copy_tree(from_dir: str, to_dir: str):
+    # 虚拟路径只解压该目录下的文件
+    archive_path, member = split_archive(from_dir)
+    if archive_path is None:
+        shutil.copytree(from_dir, to_dir)
+        return
+    prefix = member + '/' if member != '' else ''
+    os.makedirs(to_dir)
+    for name in filter(lambda x: x.startswith(prefix), archive_index(archive_path)[0].keys()):
+        to_file = os.path.join(to_dir, *name[len(prefix):].split('/'))
+        os.makedirs(os.path.dirname(to_file), exist_ok=True)
+        extract_file(join_archive(archive_path, name), to_file)
@@ -1,7 +1,7 @@
 import os
 import shutil
 import argparse
-from models.reportProcessing2 import ReportFinder
+from models.reportProcessing2 import ReportFinder, VerifyPolicy
 from models.reportProcessing2 import utils
 
 
@@ -30,6 +30,7 @@ if __name__ == '__main__':
                         help="Name of Project.")
     parser.add_argument('-n', '--nickname', type=str, required=True,
                         help="Nickname of XTS Report.")
+    VerifyPolicy.add_arguments(parser)
     # args = parser.parse_args([
     #     '-i', r"E:\ProjectPyCharm\MOKA_IP\GoogleReportManager\GoogleReports\TEST",
     #     '-o', r".\Warehouse",
@@ -38,7 +39,8 @@ if __name__ == '__main__':
     # ])
     args = parser.parse_args()
     xts_path = utils.absolute_path(str(os.path.join(args.outPath, args.projectName, args.nickname)))
-    report_finder = ReportFinder(args.inPath)
+    verify_policy = VerifyPolicy.from_arguments(args)
+    report_finder = ReportFinder(args.inPath, verify_policy=verify_policy)
     xts_path_dict = report_finder.xts_report_path_found()
     if xts_path_dict is not None:
         command = input('\n'.join([
@@ -54,8 +56,13 @@ if __name__ == '__main__':
                     utils.CheckPath.assert_not_existed(target_dir)
                     utils.CheckPath.assert_not_existed(target_zip)
                     print("Copying: [%s]\nInto: [%s]\nWith zip: [%s]\n" % (report_path.logical, target_dir, target_zip))
-                    from_path = utils.SafePath.avoid_length_limited(report_path.real)
-                    shutil.copytree(from_path, utils.SafePath.avoid_length_limited(target_dir))
-                    utils.pack(from_path, target_zip)
+                    if utils.vfs.is_virtual(report_path.real):
+                        # 压缩包内的 Report 只解压其自身的文件，zip 的根文件夹与非虚拟路径相同，为 Report 文件夹的名称
+                        utils.vfs.copy_tree(report_path.real, utils.SafePath.avoid_length_limited(target_dir))
+                        utils.pack(target_dir, target_zip, root_name=utils.vfs.basename(report_path.real))
+                    else:
+                        from_path = utils.SafePath.avoid_length_limited(report_path.real)
+                        shutil.copytree(from_path, utils.SafePath.avoid_length_limited(target_dir))
+                        utils.pack(from_path, target_zip)
         else:
             print("The program is aborted because the input: \'%s\' is not \'Y\'." % command)
@@ -2,7 +2,7 @@ import argparse
 import pandas as pd
 import time
 from openpyxl import Workbook
-from models.reportProcessing2 import Report, ReportFinder
+from models.reportProcessing2 import Report, ReportFinder, VerifyPolicy, VerifyLevel
 from models.reportProcessing2 import workbookProcess as wbP
 
 
@@ -18,12 +18,12 @@ def matching_brand(reference_table: pd.DataFrame, brand: str):
     return None, None
 
 
-def create_device_info_sheet(di_list: list[pd.DataFrame]):
+def create_device_info_sheet(di_list: list[pd.DataFrame], ro_property: list[str] = None):
     sheet = di_list[0]
     on_column = sheet.columns[0]
     for di in di_list[1:]:
         sheet = pd.merge(sheet, di, how='outer', on=on_column)
-    sheet = Report.filter_property(sheet, on=on_column)
+    sheet = Report.filter_property(sheet, on=on_column, ro_property=ro_property)
     di_sheet = wbP.b_header(sheet)
     return di_sheet
 
@@ -35,20 +35,26 @@ if __name__ == '__main__':
                         help="Path of the Report(s).(absolute path is preferred)")
     parser.add_argument('--map', type=str, required=True,
                         help="Mapping table between brand and oem.key.")
+    parser.add_argument('--ro-property', type=str, nargs='+', default=None,
+                        help="Names of the ro properties to keep from device info, default: the built-in list.")
+    VerifyPolicy.add_arguments(parser, default_level=VerifyLevel.FULL)
     # args = parser.parse_args([
     #     '--dir', r"E:\ProjectPyCharm\MOKA_IP\GoogleReportManager\GoogleReports\51M_JP2K SPL0805\0813\tvts",
     #     '--map', r".\参考\附件二RT2841A_GTV 派生品牌oem.key.xlsx",
     # ])
     args = parser.parse_args()
     ref_map = pd.read_excel(args.map, header=None)
-    report_finder = ReportFinder(args.dir, flag_keep_report=True)
+    verify_policy = VerifyPolicy.from_arguments(args)
+    kw_f = 'ro.build.fingerprint'
+    kw_o = 'ro.oem.key1'
+    # 核对所需的属性始终保留
+    ro_property = None if args.ro_property is None else list(dict.fromkeys(args.ro_property + [kw_f, kw_o]))
+    report_finder = ReportFinder(args.dir, flag_keep_report=True, verify_policy=verify_policy, ro_property=ro_property)
     report_path_list = report_finder.report_path_found(show_print=False)
     if not report_path_list:
         print("No Report has been loaded.")
         exit()
     device_info_list = []
-    kw_f = 'ro.build.fingerprint'
-    kw_o = 'ro.oem.key1'
     for report_path in report_path_list:
         report = report_path.report
         device_info = report.get_device_info_table()
@@ -74,7 +80,7 @@ if __name__ == '__main__':
     if not device_info_list:
         print("There are %d Report loaded, but no valid device_info." % len(report_path_list))
         exit()
-    device_info_sheet = create_device_info_sheet(device_info_list)
+    device_info_sheet = create_device_info_sheet(device_info_list, ro_property=ro_property)
     workbook = Workbook()
     worksheet = workbook.active
     column_width = {}